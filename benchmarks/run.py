@@ -0,0 +1,310 @@
+"""
+Reproducible benchmarks for the loader, callable resolution, rendering and API paths.
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --compare baseline.json
+
+Every benchmark is repeated and reports min/median/mean in seconds per operation.
+Results are written as JSON together with the commit and parameters they ran with.
+"""
+
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.startup import measure_startup
+from benchmarks.synthetic import GitRepository, StubServer, generate_plugin_tree
+from definitioncli.definitions.loader import Definition
+from definitioncli.definitions.manager import (
+    setup_plugin_manager,
+    teardown_plugin_manager,
+)
+
+BENCHMARKS: Dict[str, Callable] = {}
+BENCH_PARAMS: Dict[str, int] = {}
+
+
+def benchmark(func: Callable) -> Callable:
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def measure(
+    func: Callable,
+    repeat: int,
+    number: int = 1,
+    setup: Optional[Callable] = None,
+) -> Dict[str, float]:
+    """
+    Time `func` `repeat` times, each run calling it `number` times after `setup`.
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "repeat": repeat,
+        "number": number,
+    }
+
+
+def forget_plugins(paths: List[Path]):
+    """
+    Remove the synthetic plugins from sys.modules so they are loaded from scratch.
+    """
+    namespaces = {path.name for path in paths}
+    for name in list(sys.modules):
+        if name.split(".")[0] in namespaces:
+            del sys.modules[name]
+    teardown_plugin_manager()
+
+
+@benchmark
+def definition_load(paths, args):
+    def load():
+        for path in paths:
+            Definition(str(path))
+
+    return measure(load, args.repeat, setup=lambda: forget_plugins(paths))
+
+
+@benchmark
+def list_names(paths, args):
+    def setup():
+        forget_plugins(paths)
+        setup.plugins = [Definition(str(path)) for path in paths]
+
+    def run():
+        for plugin in setup.plugins:
+            list(plugin.get_automations())
+            list(plugin.get_modules())
+
+    return measure(run, args.repeat, setup=setup)
+
+
+@benchmark
+def get_modules_resolved(paths, args):
+    def setup():
+        forget_plugins(paths)
+        setup.plugins = [Definition(str(path)) for path in paths]
+
+    def run():
+        for plugin in setup.plugins:
+            for functions in plugin.get_modules().values():
+                len(functions)
+            for automation in plugin.get_automations().values():
+                automation()
+
+    return measure(run, args.repeat, setup=setup)
+
+
+def _callable_paths() -> List[str]:
+    return [f"bench0.modules.module_{m}.function_0" for m in range(BENCH_PARAMS["modules"])]
+
+
+@benchmark
+def get_callable_cold(paths, args):
+    def setup():
+        forget_plugins(paths)
+        setup.pm = setup_plugin_manager(*map(str, paths))
+
+    def run():
+        for path in _callable_paths():
+            setup.pm.get_callable(path)
+
+    return measure(run, args.repeat, setup=setup)
+
+
+@benchmark
+def get_callable_warm(paths, args):
+    forget_plugins(paths)
+    pm = setup_plugin_manager(*map(str, paths))
+    callable_paths = _callable_paths()
+    for path in callable_paths:
+        pm.get_callable(path)
+
+    def run():
+        for path in callable_paths:
+            pm.get_callable(path)
+
+    return measure(run, args.repeat, number=100)
+
+
+@benchmark
+def render_throughput(paths, args):
+    from definitioncli.models.terraform import TerraformModule, render_modules
+
+    class BenchServer(TerraformModule):
+        server_name: str
+        server_type: str
+        location: str
+        volume_size: int = 20
+
+    modules = [
+        BenchServer(server_name=f"server-{i}", server_type="cx21", location="cxfr")
+        for i in range(args.render_count)
+    ]
+
+    def run():
+        for _ in render_modules(modules):
+            pass
+
+    result = measure(run, args.repeat)
+    result["modules_per_second"] = args.render_count / result["median"]
+    return result
+
+
+@benchmark
+def api_request_get(paths, args):
+    from definitioncli.external.request import ApiRequest
+
+    with StubServer() as server:
+        api = ApiRequest(url=server.url)
+        endpoint = api.bench.bench
+        endpoint.get()
+
+        return measure(endpoint.get, args.repeat, number=args.requests)
+
+
+@benchmark
+def github_changeset_push(paths, args):
+    from definitioncli.external.github.changeset import GitHubChangeSet
+
+    repository = GitRepository("bench", "bench", "main")
+    with StubServer(repository) as server:
+
+        def setup():
+            # New content every round, otherwise there is nothing left to commit
+            setup.round = getattr(setup, "round", 0) + 1
+            setup.changeset = GitHubChangeSet(
+                "token", "bench", "bench", "main", "bench-update", url=server.url
+            )
+            for i in range(args.changeset_files):
+                setup.changeset.add(f"modules/module_{i}.tf", f"# round {setup.round}\n" * 40)
+
+        result = measure(lambda: setup.changeset.push("Regenerate"), args.repeat, setup=setup)
+
+    result["requests_per_push"] = sum(repository.requests.values()) / args.repeat
+    return result
+
+
+@benchmark
+def api_request_chain(paths, args):
+    from definitioncli.external.request import ApiRequest
+
+    api = ApiRequest(url="http://127.0.0.1")
+
+    def run():
+        api.owner.repo.pulls.comments
+
+    return measure(run, args.repeat, number=1000)
+
+
+@benchmark
+def startup_import(paths, args):
+    result = measure_startup(args.repeat)
+    # Report in seconds like every other benchmark
+    return {
+        "min": result["min_ms"] / 1000,
+        "median": result["median_ms"] / 1000,
+        "repeat": result["runs"],
+        "deferred_imported": result["deferred_imported"],
+    }
+
+
+def get_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline_path: str):
+    baseline = json.loads(Path(baseline_path).read_text())["benchmarks"]
+    print(f"{'benchmark':<24}{'baseline':>14}{'current':>14}{'change':>10}")
+    for name, result in results["benchmarks"].items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["median"]
+        after = result["median"]
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"{name:<24}{before:>14.6f}{after:>14.6f}{change:>+9.1f}%")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--plugins", type=int, default=3)
+    parser.add_argument("--modules", type=int, default=50)
+    parser.add_argument("--functions", type=int, default=20)
+    parser.add_argument("--render-count", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--changeset-files", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS))
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="Compare against an earlier results file")
+    args = parser.parse_args(argv)
+
+    BENCH_PARAMS.update(
+        plugins=args.plugins, modules=args.modules, functions=args.functions
+    )
+
+    root = Path(tempfile.mkdtemp(prefix="definitioncli-bench-"))
+    try:
+        paths = generate_plugin_tree(root, args.plugins, args.modules, args.functions)
+        results = {}
+        for name in args.only or BENCHMARKS:
+            results[name] = BENCHMARKS[name](paths, args)
+            print(f"{name:<24}{results[name]['median']:.6f}s", file=sys.stderr)
+        forget_plugins(paths)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    report = {
+        "commit": get_commit(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            **BENCH_PARAMS,
+            "render_count": args.render_count,
+            "requests": args.requests,
+            "changeset_files": args.changeset_files,
+            "repeat": args.repeat,
+        },
+        "benchmarks": results,
+    }
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        compare(report, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Import-time budget for the CLI start-up.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --budget-ms 40 --runs 15
+
+Runs `python -X importtime -m definitioncli --help` repeatedly and takes the median
+cumulative import time of the definitioncli modules. Exits non-zero when it exceeds
+the budget, or when start-up imports one of the deferred heavy dependencies.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+DEFAULT_BUDGET_MS = 60.0
+DEFAULT_RUNS = 9
+DEFAULT_COMMAND = ["-m", "definitioncli", "--help"]
+
+# Only imported once a feature needs them, never by start-up itself
+DEFERRED_MODULES = ("pydantic", "jinja2", "requests", "yaml")
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(output: str) -> Dict[str, int]:
+    """
+    Cumulative microseconds of every top level import in `-X importtime` output.
+    """
+    imports = {}
+    for line in output.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and len(match.group(3)) == 1:
+            imports[match.group(4)] = imports.get(match.group(4), 0) + int(match.group(2))
+    return imports
+
+
+def get_imported_modules(output: str) -> List[str]:
+    return [
+        match.group(4)
+        for match in map(IMPORTTIME_LINE.match, output.splitlines())
+        if match
+    ]
+
+
+def run_once(command: List[str]) -> str:
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", *command],
+        capture_output=True,
+        text=True,
+        # A running daemon must not make the command skip its local work
+        env={**os.environ, "DEFINITIONCLI_SOCKET": os.devnull},
+    )
+    return process.stderr
+
+
+def measure_startup(
+    runs: int = DEFAULT_RUNS, command: Optional[List[str]] = None
+) -> Dict[str, object]:
+    """
+    Median import time of the definitioncli modules at start-up, in milliseconds,
+    together with the deferred modules that were imported anyway.
+    """
+    timings, violations = [], set()
+    for _ in range(runs):
+        output = run_once(command or DEFAULT_COMMAND)
+        own = sum(
+            cumulative
+            for name, cumulative in parse_importtime(output).items()
+            if name.split(".")[0] == "definitioncli"
+        )
+        timings.append(own / 1000)
+        violations.update(
+            name
+            for name in get_imported_modules(output)
+            if name.split(".")[0] in DEFERRED_MODULES
+        )
+
+    return {
+        "median_ms": statistics.median(timings),
+        "min_ms": min(timings),
+        "runs": runs,
+        "deferred_imported": sorted({name.split(".")[0] for name in violations}),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    args = parser.parse_args(argv)
+
+    result = measure_startup(args.runs)
+    print(
+        f"definitioncli start-up imports: {result['median_ms']:.1f} ms median, "
+        f"{result['min_ms']:.1f} ms min over {args.runs} runs "
+        f"(budget {args.budget_ms:.1f} ms)"
+    )
+
+    failed = False
+    if result["deferred_imported"]:
+        print(f"Start-up imports deferred modules: {', '.join(result['deferred_imported'])}")
+        failed = True
+    if result["median_ms"] > args.budget_ms:
+        print(f"Over budget by {result['median_ms'] - args.budget_ms:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
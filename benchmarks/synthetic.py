@@ -0,0 +1,280 @@
+"""
+Fixtures for the benchmarks: synthetic plugin trees and a local stub HTTP server.
+"""
+
+import base64
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+
+def generate_plugin_tree(
+    root: Path, plugins: int, modules: int, functions: int
+) -> List[Path]:
+    """
+    Writes `plugins` plugin directories, each with `modules` module files and as many
+    automations, every module defining `functions` functions.
+
+    Returns:
+        The plugin directories.
+    """
+    paths = []
+    for p in range(plugins):
+        plugin = root / f"bench_plugin_{p}"
+        (plugin / "modules").mkdir(parents=True, exist_ok=True)
+        (plugin / "automations").mkdir(parents=True, exist_ok=True)
+        (plugin / "__init__.py").write_text(f'__virtualname__ = "bench{p}"\n')
+        (plugin / "modules" / "__init__.py").write_text("")
+        (plugin / "automations" / "__init__.py").write_text("")
+
+        for m in range(modules):
+            body = "".join(
+                f"def function_{k}(value, scale={k}):\n    return value * scale\n\n\n"
+                for k in range(functions)
+            )
+            (plugin / "modules" / f"module_{m}.py").write_text(body)
+            (plugin / "automations" / f"automation_{m}.py").write_text(
+                f"def main():\n    return {m}\n"
+            )
+        paths.append(plugin)
+    return paths
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Buffer the response so headers and body leave in one write, avoiding Nagle stalls
+    wbufsize = -1
+    payload = json.dumps({"id": 1, "name": "bench", "full_name": "bench/bench"}).encode()
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.payload)))
+        self.end_headers()
+        self.wfile.write(self.payload)
+
+    do_GET = _reply
+    do_POST = _reply
+
+
+def _object_sha(kind: bytes, content: bytes) -> str:
+    return hashlib.sha1(b"%s %d\0" % (kind, len(content)) + content).hexdigest()
+
+
+class GitRepository:
+    """
+    In-memory repository behind the Git Data API stub. Trees are stored flat, as
+    the mapping of every path to its (blob sha, mode). With `tree_limit` tree listings
+    stop after that many entries and report themselves truncated, like GitHub does
+    for very large trees.
+    """
+
+    def __init__(self, owner: str, repo: str, branch: str):
+        self.owner = owner
+        self.repo = repo
+        self.lock = threading.Lock()
+        self.blobs: Dict[str, bytes] = {}
+        self.trees: Dict[str, Dict[str, Tuple[str, str]]] = {}
+        self.commits: Dict[str, dict] = {}
+        self.refs: Dict[str, str] = {}
+        self.pulls: List[dict] = []
+        self.requests: Dict[str, int] = {}
+        self.tree_limit: Optional[int] = None
+
+        readme = self.add_blob(b"# stub\n")
+        tree = self.add_tree({"README.md": (readme, "100644")})
+        self.refs[f"refs/heads/{branch}"] = self.add_commit("initial", tree, [])
+
+    def add_blob(self, content: bytes) -> str:
+        sha = _object_sha(b"blob", content)
+        self.blobs[sha] = content
+        return sha
+
+    def add_tree(self, entries: Dict[str, Tuple[str, str]]) -> str:
+        sha = _object_sha(b"tree", json.dumps(sorted(entries.items())).encode())
+        self.trees[sha] = entries
+        return sha
+
+    def add_commit(self, message: str, tree: str, parents: List[str]) -> str:
+        commit = {"message": message, "tree": {"sha": tree}, "parents": parents}
+        sha = _object_sha(b"commit", json.dumps(commit, sort_keys=True).encode())
+        self.commits[sha] = {"sha": sha, **commit}
+        return sha
+
+    def get_tree(self, ref: str) -> Optional[Dict[str, Tuple[str, str]]]:
+        """
+        Tree of a commit sha or branch name.
+        """
+        commit = self.commits.get(self.refs.get(f"refs/heads/{ref}", ref))
+        return self.trees[commit["tree"]["sha"]] if commit else None
+
+    def get_file(self, branch: str, path: str) -> Optional[bytes]:
+        entry = self.get_tree(branch).get(path)
+        return self.blobs[entry[0]] if entry else None
+
+
+class GitHubStubHandler(BaseHTTPRequestHandler):
+    """
+    The part of the GitHub REST API a change set push uses, backed by `GitRepository`.
+    """
+
+    protocol_version = "HTTP/1.1"
+    wbufsize = -1
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status: int, payload=None):
+        body = json.dumps(payload if payload is not None else {}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, method: str):
+        repository: GitRepository = self.server.repository
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        length = int(self.headers.get("Content-Length") or 0)
+        data = json.loads(self.rfile.read(length)) if length else {}
+
+        prefix = f"/repos/{repository.owner}/{repository.repo}/"
+        if not parts.path.startswith(prefix):
+            return self._reply(404, {"message": "Not Found"})
+        route = parts.path[len(prefix):]
+
+        with repository.lock:
+            name = f"{method} {'/'.join(route.split('/')[:2])}"
+            repository.requests[name] = repository.requests.get(name, 0) + 1
+            status, payload = self._dispatch(repository, method, route, query, data)
+        self._reply(status, payload)
+
+    def _dispatch(self, repository: GitRepository, method: str, route: str, query, data):
+        if method == "GET" and route.startswith("git/ref/heads/"):
+            ref = "refs/" + route[len("git/ref/"):]
+            if ref not in repository.refs:
+                return 404, {"message": "Not Found"}
+            return 200, {"ref": ref, "object": {"sha": repository.refs[ref], "type": "commit"}}
+
+        if method == "GET" and route.startswith("git/commits/"):
+            commit = repository.commits.get(route.rsplit("/", 1)[1])
+            return (200, commit) if commit else (404, {"message": "Not Found"})
+
+        if method == "GET" and route.startswith("git/trees/"):
+            tree = repository.trees.get(route.rsplit("/", 1)[1])
+            if tree is None:
+                return 404, {"message": "Not Found"}
+            entries = [
+                {"path": path, "mode": mode, "type": "blob", "sha": sha}
+                for path, (sha, mode) in sorted(tree.items())
+            ]
+            limit = repository.tree_limit
+            if limit is not None and len(entries) > limit:
+                return 200, {"tree": entries[:limit], "truncated": True}
+            return 200, {"tree": entries, "truncated": False}
+
+        if method == "GET" and route.startswith("contents/"):
+            path = unquote(route[len("contents/"):])
+            tree = repository.get_tree(query.get("ref", [""])[0])
+            if tree is None or path not in tree:
+                return 404, {"message": "Not Found"}
+            return 200, {"type": "file", "path": path, "sha": tree[path][0]}
+
+        if method == "POST" and route == "git/blobs":
+            return 201, {"sha": repository.add_blob(base64.b64decode(data["content"]))}
+
+        if method == "POST" and route == "git/trees":
+            entries = dict(repository.trees[data["base_tree"]]) if "base_tree" in data else {}
+            for entry in data["tree"]:
+                if "content" in entry:
+                    entries[entry["path"]] = (
+                        repository.add_blob(entry["content"].encode("utf-8")),
+                        entry["mode"],
+                    )
+                elif entry["sha"] is None:
+                    # GitHub rejects deleting a path the base tree doesn't have
+                    if entries.pop(entry["path"], None) is None:
+                        return 422, {"message": f"Path {entry['path']} not in base tree"}
+                elif entry["sha"] in repository.blobs:
+                    entries[entry["path"]] = (entry["sha"], entry["mode"])
+                else:
+                    return 422, {"message": f"Unknown blob {entry['sha']}"}
+            return 201, {"sha": repository.add_tree(entries)}
+
+        if method == "POST" and route == "git/commits":
+            sha = repository.add_commit(data["message"], data["tree"], data["parents"])
+            return 201, repository.commits[sha]
+
+        if method == "POST" and route == "git/refs":
+            if data["ref"] in repository.refs:
+                return 422, {"message": "Reference already exists"}
+            repository.refs[data["ref"]] = data["sha"]
+            return 201, {"ref": data["ref"], "object": {"sha": data["sha"]}}
+
+        if method == "PATCH" and route.startswith("git/refs/heads/"):
+            ref = route[len("git/"):]
+            if ref not in repository.refs:
+                return 422, {"message": "Reference does not exist"}
+            repository.refs[ref] = data["sha"]
+            return 200, {"ref": ref, "object": {"sha": data["sha"]}}
+
+        if method == "GET" and route == "pulls":
+            head = query.get("head", [None])[0]
+            return 200, [
+                pull
+                for pull in repository.pulls
+                if head is None or f"{repository.owner}:{pull['head']}" == head
+            ]
+
+        if method == "POST" and route == "pulls":
+            pull = {"number": len(repository.pulls) + 1, "state": "open", **data}
+            repository.pulls.append(pull)
+            return 201, pull
+
+        return 404, {"message": "Not Found"}
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+
+class StubServer:
+    """
+    Threaded HTTP server on a free local port, by default answering every request
+    with JSON. With `repository` it serves the Git Data API stub instead.
+    """
+
+    def __init__(self, repository: Optional[GitRepository] = None):
+        handler = GitHubStubHandler if repository is not None else StubHandler
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._server.repository = repository
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
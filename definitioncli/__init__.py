@@ -0,0 +1,37 @@
+import importlib
+
+__all__ = ["TerraformModule"]
+
+# Public names and the module they live in, imported on first access so that
+# `import definitioncli` doesn't pull in pydantic, jinja2 or requests
+_LAZY_ATTRIBUTES = {
+    "TerraformModule": "definitioncli.models.terraform",
+}
+
+_LAZY_SUBPACKAGES = {
+    "cli",
+    "config",
+    "daemon",
+    "definitions",
+    "external",
+    "logging",
+    "models",
+    "profiling",
+    "templates",
+    "utils",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+        # Cache it, later lookups don't go through __getattr__ anymore
+        globals()[name] = value
+        return value
+    if name in _LAZY_SUBPACKAGES:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | _LAZY_SUBPACKAGES)
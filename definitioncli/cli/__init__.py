@@ -0,0 +1,65 @@
+import argparse
+import sys
+from typing import List, Optional
+
+from definitioncli.cli import daemon as daemon_command
+from definitioncli.cli import desctibe as describe_command
+from definitioncli.cli import list as list_command
+from definitioncli.cli import run as run_command
+from definitioncli.daemon import forward
+from definitioncli.profiling import disable_profiling, enable_profiling
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="definitioncli",
+        description="A CLI tool making GIT definitions slightly easier",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="TRACE_FILE",
+        help="Record timing spans and write them to TRACE_FILE in Chrome trace format",
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Run in this process even when a daemon is listening",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    list_command.register(subparsers)
+    describe_command.register(subparsers)
+    run_command.register(subparsers)
+    daemon_command.register(subparsers)
+    return parser
+
+
+def print_profile_summary(summary: dict):
+    for category, total in sorted(summary.items(), key=lambda item: -item[1]["total_ms"]):
+        print(
+            f"{category:<20}{total['count']:>8}{total['total_ms']:>12.2f} ms",
+            file=sys.stderr,
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    # Hand the command to a warm daemon when one is running
+    if args.command != "daemon" and not args.profile and not args.no_daemon:
+        code = forward(argv)
+        if code is not None:
+            return code
+
+    if not args.profile:
+        return args.func(args) or 0
+
+    enable_profiling()
+    try:
+        return args.func(args) or 0
+    finally:
+        profiler = disable_profiling()
+        profiler.export(args.profile)
+        print_profile_summary(profiler.summary())
@@ -0,0 +1,89 @@
+import logging
+import sys
+import time
+
+from definitioncli.daemon import DaemonError, get_socket_path, send_request
+
+logger = logging.getLogger(__name__)
+
+START_TIMEOUT = 10.0
+
+
+def register(subparsers):
+    parser = subparsers.add_parser(
+        "daemon", help="Run a warm background process serving CLI commands"
+    )
+    parser.add_argument(
+        "action", choices=["start", "stop", "status"], help="What to do with the daemon"
+    )
+    parser.add_argument("--socket", help="Unix socket path of the daemon")
+    parser.add_argument(
+        "--plugin",
+        dest="plugins",
+        action="append",
+        default=[],
+        help="Plugin directory to load up front, can be given multiple times",
+    )
+    parser.add_argument(
+        "--foreground", action="store_true", help="Serve from this process instead of detaching"
+    )
+    parser.set_defaults(func=run)
+
+
+def start(args) -> int:
+    if args.foreground:
+        from definitioncli.daemon.server import serve
+
+        serve(args.socket, args.plugins)
+        return 0
+
+    import subprocess
+
+    command = [sys.executable, "-m", "definitioncli", "daemon", "start", "--foreground"]
+    if args.socket:
+        command += ["--socket", args.socket]
+    for plugin in args.plugins:
+        command += ["--plugin", plugin]
+
+    process = subprocess.Popen(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            status = send_request({"command": "status"}, args.socket)
+        except DaemonError:
+            if process.poll() is not None:
+                logger.error(f"Daemon exited with code {process.returncode}")
+                return 1
+            time.sleep(0.05)
+            continue
+        print(f"Daemon {status['pid']} listening on {get_socket_path(args.socket)}")
+        return 0
+
+    logger.error(f"Daemon did not come up within {START_TIMEOUT}s")
+    return 1
+
+
+def run(args) -> int:
+    if args.action == "start":
+        return start(args)
+
+    try:
+        response = send_request({"command": args.action}, args.socket)
+    except DaemonError as e:
+        logger.error(e)
+        return 1
+
+    if args.action == "status":
+        print(f"pid:      {response['pid']}")
+        print(f"uptime:   {response['uptime']:.0f}s")
+        print(f"requests: {response['requests']}")
+        for plugin_dir in response["plugin_dirs"]:
+            print(f"plugin:   {plugin_dir}")
+    return 0
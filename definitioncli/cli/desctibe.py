@@ -0,0 +1,74 @@
+import json
+import logging
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from definitioncli.cli.list import get_unloaded_dirs
+from definitioncli.definitions.manager import setup_plugin_manager
+from definitioncli.definitions.manifest import DEFAULT_MANIFEST_PATH, ManifestCache
+
+logger = logging.getLogger(__name__)
+
+
+def register(subparsers):
+    parser = subparsers.add_parser(
+        "describe", help="Show the automations and module function signatures of plugins"
+    )
+    parser.add_argument(
+        "--plugin",
+        dest="plugins",
+        action="append",
+        required=True,
+        help="Plugin directory to describe, can be given multiple times",
+    )
+    parser.add_argument(
+        "--manifest",
+        default=str(DEFAULT_MANIFEST_PATH),
+        help="Manifest cache describing unchanged plugin files without executing them",
+    )
+    parser.add_argument(
+        "--no-manifest",
+        dest="manifest",
+        action="store_const",
+        const=None,
+        help="Execute every plugin module to describe it, without reading or writing the manifest",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the description as JSON")
+    parser.set_defaults(func=run)
+
+
+def describe_plugins(
+    plugin_dirs, manifest_path: Optional[str] = None
+) -> Tuple[dict, List[str]]:
+    """
+    Describes every loaded plugin, together with the requested directories that
+    aren't loaded.
+    """
+    # Inside the daemon the plugins are already loaded and the manifest goes unused
+    manifest = ManifestCache(Path(manifest_path)) if manifest_path else None
+    pm = setup_plugin_manager(*plugin_dirs, manifest=manifest)
+    described = {}
+    for name in pm.list_plugins():
+        plugin = pm.get_plugin(name)
+        described[name] = {
+            "automations": list(plugin.get_automations()),
+            "modules": plugin.describe_modules(),
+        }
+    return described, get_unloaded_dirs(pm, plugin_dirs)
+
+
+def run(args) -> int:
+    described, unloaded = describe_plugins(args.plugins, args.manifest)
+    if args.json:
+        print(json.dumps(described, indent=2))
+        return 1 if unloaded else 0
+
+    for name, plugin in described.items():
+        print(name)
+        for automation in plugin["automations"]:
+            print(f"  {automation}")
+        for module, functions in plugin["modules"].items():
+            print(f"  {module}")
+            for function, signature in functions.items():
+                print(f"    {function}{signature}")
+    return 1 if unloaded else 0
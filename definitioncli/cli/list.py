@@ -0,0 +1,197 @@
+import argparse
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from definitioncli.definitions.loader import load_definition_classes
+from definitioncli.definitions.manager import PluginManager, setup_plugin_manager
+from definitioncli.definitions.manifest import DEFAULT_MANIFEST_PATH, ManifestCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEFINITIONS_PATH = Path(".definitions") / "definitions"
+MAX_CACHED_STORES = 8
+
+# Filled stores by definitions and inventory signature, kept warm inside the daemon
+_store_cache: Dict[Tuple, Tuple] = {}
+
+
+def register(subparsers):
+    parser = subparsers.add_parser(
+        "list", help="List plugins, or query an inventory of definitions"
+    )
+    parser.add_argument(
+        "--plugin",
+        dest="plugins",
+        action="append",
+        default=[],
+        help="Plugin directory to list, can be given multiple times",
+    )
+    parser.add_argument(
+        "--manifest",
+        default=str(DEFAULT_MANIFEST_PATH),
+        help="Manifest cache describing unchanged plugin files without executing them",
+    )
+    parser.add_argument(
+        "--no-manifest",
+        dest="manifest",
+        action="store_const",
+        const=None,
+        help="Execute every plugin file to list it, without reading or writing the manifest",
+    )
+    parser.add_argument("--inventory", help="JSON, JSONL or YAML inventory file to query")
+    parser.add_argument(
+        "--definition", help="Definition class the inventory records are validated as"
+    )
+    parser.add_argument(
+        "--definitions",
+        default=str(DEFAULT_DEFINITIONS_PATH),
+        help="Definitions package the definition class is looked up in",
+    )
+    parser.add_argument(
+        "--where",
+        action="append",
+        default=[],
+        metavar="FIELD=VALUE",
+        help="Only include instances where FIELD equals VALUE",
+    )
+    parser.add_argument("--group-by", metavar="FIELD", help="Count instances per FIELD value")
+    parser.add_argument("--count", action="store_true", help="Only print the number of matches")
+    parser.set_defaults(func=run)
+
+
+def parse_where(expressions) -> dict:
+    criteria = {}
+    for expression in expressions:
+        field, separator, value = expression.partition("=")
+        if not separator:
+            raise argparse.ArgumentTypeError(f"Expected FIELD=VALUE, got '{expression}'")
+        criteria[field] = value
+    return criteria
+
+
+def get_unloaded_dirs(pm: PluginManager, plugin_dirs) -> List[str]:
+    """
+    The requested plugin directories the manager holds no plugin for, because they
+    failed to load or, inside the daemon, were never part of its plugins.
+    """
+    loaded = {plugin.path.resolve() for plugin in pm.plugins.values()}
+    unloaded = [path for path in plugin_dirs if Path(path).resolve() not in loaded]
+    for path in unloaded:
+        logger.error(f"Plugin at {path} is not loaded")
+    return unloaded
+
+
+def list_plugins(plugin_dirs, manifest_path: Optional[str] = None) -> int:
+    # Inside the daemon the plugins are already loaded and the manifest goes unused
+    manifest = ManifestCache(Path(manifest_path)) if manifest_path else None
+    pm = setup_plugin_manager(*plugin_dirs, manifest=manifest)
+    for name in pm.list_plugins():
+        plugin = pm.get_plugin(name)
+        print(name)
+        for automation in plugin.get_automations():
+            print(f"  {automation}")
+        for module in plugin.get_modules():
+            print(f"  {module}")
+    return 1 if get_unloaded_dirs(pm, plugin_dirs) else 0
+
+
+def get_signature(path: Path) -> Tuple:
+    """
+    Changes whenever the file, or any python file below the directory, changes.
+    """
+    files = sorted(path.rglob("*.py")) if path.is_dir() else [path]
+    return tuple((str(file), file.stat().st_mtime_ns, file.stat().st_size) for file in files)
+
+
+def load_store(args):
+    """
+    Returns the filled inventory store and its load errors, or None for an unknown
+    definition. Stores are reused while neither the inventory nor the definitions change.
+    """
+    # Imported here so listing plugins doesn't pay for pydantic
+    from definitioncli.models.ingest import DefinitionLoader
+    from definitioncli.models.inventory import InventoryStore
+
+    definitions, inventory = Path(args.definitions).resolve(), Path(args.inventory).resolve()
+    key = (
+        args.definition,
+        get_signature(definitions),
+        get_signature(inventory),
+    )
+    if key in _store_cache:
+        return _store_cache[key]
+
+    classes = load_definition_classes(definitions)
+    cls = classes.get(args.definition)
+    if cls is None:
+        logger.error(
+            f"Unknown definition '{args.definition}', expected one of {list(classes)}"
+        )
+        return None
+
+    loader = DefinitionLoader(cls)
+    store = InventoryStore(cls)
+    store.extend(loader.load(inventory))
+
+    if len(_store_cache) >= MAX_CACHED_STORES:
+        del _store_cache[next(iter(_store_cache))]
+    _store_cache[key] = store, loader.errors
+    return store, loader.errors
+
+
+def query_inventory(args) -> int:
+    try:
+        loaded: Optional[Tuple] = load_store(args)
+    except (OSError, ImportError, ValueError) as e:
+        logger.error(f"Could not load inventory {args.inventory}: {e}")
+        return 1
+    if loaded is None:
+        return 1
+
+    store, errors = loaded
+    for error in errors:
+        messages = (
+            f"{'.'.join(map(str, detail['loc'][1:])) or 'record'}: {detail['msg']}"
+            for detail in error.errors
+        )
+        logger.warning(f"{error.path}:{error.line}: {'; '.join(messages)}")
+
+    # Bad fields or values are user input errors, answer them with a message
+    try:
+        criteria = store.parse_criteria(parse_where(args.where))
+        if args.group_by:
+            result = store.group_by(args.group_by, **criteria)
+        elif args.count:
+            result = store.count(**criteria)
+        else:
+            result = store.filter(**criteria)
+    except KeyError as e:
+        logger.error(e.args[0])
+        return 1
+    except (argparse.ArgumentTypeError, ValueError) as e:
+        logger.error(e)
+        return 1
+
+    if args.group_by:
+        for value, count in sorted(result.items(), key=str):
+            print(f"{value}\t{count}")
+    elif args.count:
+        print(result)
+    else:
+        for row in result:
+            print(store.row(row))
+    return 0
+
+
+def run(args) -> int:
+    if args.inventory:
+        if not args.definition:
+            logger.error("--inventory requires --definition")
+            return 1
+        return query_inventory(args)
+
+    if not args.plugins:
+        logger.error("Nothing to list, pass --plugin or --inventory")
+        return 1
+    return list_plugins(args.plugins, args.manifest)
@@ -0,0 +1,66 @@
+import json
+import logging
+
+from definitioncli.definitions.manager import setup_plugin_manager
+
+logger = logging.getLogger(__name__)
+
+
+def register(subparsers):
+    parser = subparsers.add_parser("run", help="Run automations concurrently")
+    parser.add_argument(
+        "automations",
+        nargs="+",
+        metavar="AUTOMATION",
+        help="Automation path (plugin.automations.name) or plugin name for all of its automations",
+    )
+    parser.add_argument(
+        "--plugin",
+        dest="plugins",
+        action="append",
+        required=True,
+        help="Plugin directory, can be given multiple times",
+    )
+    parser.add_argument("--workers", type=int, help="Automations running at the same time")
+    parser.add_argument("--timeout", type=float, help="Seconds every automation may run")
+    parser.add_argument(
+        "--threads",
+        action="store_true",
+        help="Run on threads instead of isolated processes, timed out threads still finish",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON lines")
+    parser.set_defaults(func=run)
+
+
+def print_result(result):
+    print(f"{result.path}: {result.status} ({result.duration:.2f}s)")
+    if result.output:
+        for line in result.output.splitlines():
+            print(f"  | {line}")
+    for record in result.logs or []:
+        print(f"  {record['level']} {record['logger']}: {record['message']}")
+    if result.ok:
+        print(f"  -> {result.value!r}")
+    else:
+        print(f"  {result.error}")
+
+
+def run(args) -> int:
+    # Imported here so other commands don't pay for multiprocessing
+    from definitioncli.definitions.runner import MODE_PROCESS, MODE_THREAD, AutomationRunner
+
+    pm = setup_plugin_manager(*args.plugins)
+    mode = MODE_THREAD if args.threads else MODE_PROCESS
+    runner = AutomationRunner(pm, workers=args.workers, mode=mode, timeout=args.timeout)
+    try:
+        results = runner.run(args.automations)
+    except (KeyError, ValueError) as e:
+        logger.error(e)
+        return 1
+
+    for result in results:
+        if args.json:
+            print(json.dumps(result._asdict(), default=repr))
+        else:
+            print_result(result)
+    return 0 if all(result.ok for result in results) else 1
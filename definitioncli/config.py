@@ -0,0 +1,43 @@
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+DEFAULT_CONFIG_PATH = Path(".definitions") / "config.cfg"
+
+
+def load_config(path: Optional[Union[str, Path]] = None) -> Dict[str, dict]:
+    """
+    Reads the definitions config, a TOML file with one table per provider,
+    e.g. `["Provider.git"]`.
+
+    Parameters:
+        path (Path): Config file, defaults to `.definitions/config.cfg`.
+
+    Returns:
+        dict: The tables of the config by name.
+    """
+    try:
+        import tomllib
+    except ModuleNotFoundError:
+        try:
+            import tomli as tomllib
+        except ImportError as e:
+            raise ImportError("Reading the config before Python 3.11 requires tomli.") from e
+
+    with open(path or DEFAULT_CONFIG_PATH, "rb") as file:
+        return tomllib.load(file)
+
+
+def get_provider_config(
+    provider: str, path: Optional[Union[str, Path]] = None
+) -> Dict[str, str]:
+    """
+    Returns the `Provider.<provider>` table of the definitions config.
+
+    Raises:
+        KeyError: If the config has no table for the provider.
+    """
+    config = load_config(path)
+    section = f"Provider.{provider}"
+    if section not in config:
+        raise KeyError(f"No [\"{section}\"] table in {path or DEFAULT_CONFIG_PATH}")
+    return config[section]
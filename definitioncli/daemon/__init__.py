@@ -0,0 +1,77 @@
+"""
+Long-lived daemon keeping plugins, compiled templates and HTTP pools warm.
+
+Thin CLI invocations forward their arguments over a Unix domain socket and the
+daemon runs the command in its own process, returning the captured output. Every
+request and response is a single line of JSON. This module is the client, every
+CLI invocation imports it; the server lives in `definitioncli.daemon.server`.
+"""
+
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+DEFAULT_SOCKET_PATH = Path.home() / ".cache" / "definitioncli" / "daemon.sock"
+SOCKET_ENV = "DEFINITIONCLI_SOCKET"
+CONNECT_TIMEOUT = 0.5
+
+
+def get_socket_path(path: Optional[str] = None) -> Path:
+    return Path(path or os.environ.get(SOCKET_ENV) or DEFAULT_SOCKET_PATH)
+
+
+class DaemonError(Exception):
+    """Raised when the daemon can't be reached or answers with an error."""
+
+
+def send_request(request: dict, path: Optional[str] = None, timeout: Optional[float] = None) -> dict:
+    """
+    Sends a single request to the daemon and returns its response.
+
+    Raises:
+        DaemonError: If no daemon listens on the socket.
+    """
+    socket_path = get_socket_path(path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(str(socket_path))
+        except (FileNotFoundError, ConnectionRefusedError, socket.timeout) as e:
+            raise DaemonError(f"No daemon listening on {socket_path}") from e
+
+        sock.settimeout(timeout)
+        with sock.makefile("rwb") as stream:
+            stream.write(json.dumps(request).encode() + b"\n")
+            stream.flush()
+            line = stream.readline()
+    finally:
+        sock.close()
+
+    if not line:
+        raise DaemonError("The daemon closed the connection without answering")
+    return json.loads(line)
+
+
+def forward(argv: List[str], path: Optional[str] = None) -> Optional[int]:
+    """
+    Runs a CLI command in the daemon and replays its output.
+
+    Returns:
+        The exit code of the command, or None when no daemon is running.
+    """
+    try:
+        response = send_request(
+            {"command": "run", "argv": argv, "cwd": os.getcwd()}, path
+        )
+    except DaemonError:
+        return None
+
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stderr.write(response.get("stderr", ""))
+    if "error" in response:
+        print(f"daemon: {response['error']}", file=sys.stderr)
+    return response.get("code", 1)
@@ -0,0 +1,171 @@
+import contextlib
+import io
+import json
+import logging
+import os
+import socketserver
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from definitioncli.daemon import CONNECT_TIMEOUT, DaemonError, get_socket_path, send_request
+
+logger = logging.getLogger(__name__)
+
+
+def plugin_dirs_key(plugin_dirs) -> Tuple[str, ...]:
+    return tuple(sorted(str(Path(plugin_dir).resolve()) for plugin_dir in plugin_dirs))
+
+
+class DaemonState:
+    """
+    Warm state shared by every request the daemon handles.
+    """
+
+    def __init__(self, plugin_dirs=()):
+        self.started = time.time()
+        self.requests = 0
+        self.plugin_dirs: Tuple[str, ...] = ()
+        if plugin_dirs:
+            self.ensure_plugins(plugin_dirs)
+
+    def warm_up(self):
+        """
+        Pays the import and setup cost of the heavy dependencies once, up front.
+        """
+        from definitioncli.external.request import ApiRequest  # noqa: F401
+        from definitioncli.models import ingest, inventory  # noqa: F401
+        from definitioncli.templates import get_template
+
+        get_template("module.tf.j2")
+
+    def ensure_plugins(self, plugin_dirs):
+        """
+        Makes the plugin manager hold exactly `plugin_dirs`, keeping it when it does
+        and reloading only the definition files that changed since the last request.
+        """
+        from definitioncli.definitions.manager import (
+            get_plugin_manager,
+            setup_plugin_manager,
+            teardown_plugin_manager,
+        )
+
+        key = plugin_dirs_key(plugin_dirs)
+        if key == self.plugin_dirs:
+            reloaded = get_plugin_manager().reload_changed()
+            if reloaded:
+                logger.info(f"Reloaded {reloaded}")
+            return
+
+        teardown_plugin_manager()
+        setup_plugin_manager(*key)
+        self.plugin_dirs = key
+
+    def run(self, argv: List[str], cwd: Optional[str] = None) -> dict:
+        from definitioncli.cli import build_parser
+
+        self.requests += 1
+        stdout, stderr = io.StringIO(), io.StringIO()
+        code = 0
+        previous_cwd = os.getcwd()
+        # Requests are handled one at a time, so the process state can be borrowed
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                if cwd:
+                    os.chdir(cwd)
+                args = build_parser().parse_args(argv)
+                if getattr(args, "plugins", None):
+                    self.ensure_plugins(args.plugins)
+                code = args.func(args) or 0
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else 1
+            except Exception:
+                traceback.print_exc()
+                code = 1
+            finally:
+                os.chdir(previous_cwd)
+
+        return {"stdout": stdout.getvalue(), "stderr": stderr.getvalue(), "code": code}
+
+    def status(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "uptime": time.time() - self.started,
+            "requests": self.requests,
+            "plugin_dirs": list(self.plugin_dirs),
+        }
+
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+
+        try:
+            request = json.loads(line)
+            response = self.server.dispatch(request)
+        except Exception as e:
+            response = {"error": str(e), "code": 1}
+
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    """
+    Serves CLI commands over a Unix domain socket, one request at a time.
+
+    Commands run in the daemon process redirect stdout/stderr and may change the
+    working directory, so requests are deliberately not handled concurrently.
+    """
+
+    def __init__(self, path: Optional[str] = None, plugin_dirs=(), warm_up: bool = True):
+        self.socket_path = get_socket_path(path)
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        self._remove_stale_socket()
+
+        self.state = DaemonState(plugin_dirs)
+        if warm_up:
+            self.state.warm_up()
+
+        super().__init__(str(self.socket_path), DaemonHandler)
+        # Only the owner may ask the daemon to run plugin code
+        os.chmod(self.socket_path, 0o600)
+
+    def _remove_stale_socket(self):
+        if not self.socket_path.exists():
+            return
+        try:
+            send_request({"command": "status"}, str(self.socket_path), timeout=CONNECT_TIMEOUT)
+        except DaemonError:
+            self.socket_path.unlink()
+            return
+        raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+
+    def dispatch(self, request: dict) -> dict:
+        command = request.get("command")
+        if command == "run":
+            return self.state.run(request.get("argv", []), request.get("cwd"))
+        if command == "status":
+            return self.state.status()
+        if command == "stop":
+            # shutdown() blocks until serve_forever returns, which is busy serving this request
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"stopping": True}
+        raise ValueError(f"Unknown daemon command '{command}'")
+
+    def server_close(self):
+        super().server_close()
+        with contextlib.suppress(FileNotFoundError):
+            self.socket_path.unlink()
+
+
+def serve(path: Optional[str] = None, plugin_dirs=()):
+    server = DaemonServer(path, plugin_dirs)
+    logger.info(f"Daemon listening on {server.socket_path}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
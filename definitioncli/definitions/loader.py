@@ -1,33 +1,313 @@
+import ast
+import copy
 import importlib
+import importlib.machinery
 import importlib.util
+import os
 import sys
 import logging
 import re
-from typing import Callable, Dict
+import threading
+import time
+import weakref
+from functools import partial
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Set, Tuple
 from types import ModuleType
 from pathlib import Path
 
+from definitioncli.profiling import ProfiledLoader, is_profiling, span
+
+from .manifest import ManifestCache, get_signature
+
 logger = logging.getLogger(__name__)
 
+SUB_MODULE_NAMES = ["automations", "modules"]
+DUNDER_PATTERN = re.compile(r"^__.*__$")
+
+# Files modified this recently may have a bytecode cache of an earlier version with the
+# same mtime second and size, the cache can't tell them apart
+RACY_BYTECODE_SECONDS = 2.0
+
+# A captured file: its stat and its source at the time it was registered
+Source = Tuple[os.stat_result, bytes]
+
+
+class LazyMapping(Mapping):
+    """
+    Read-only mapping whose keys are known up front but whose values are only
+    produced (and cached) the first time they are looked up.
+    """
+
+    def __init__(self, factories: Dict[str, Callable]):
+        self._factories = factories
+        self._values: Dict[str, object] = {}
+
+    def __getitem__(self, key):
+        if key not in self._values:
+            self._values[key] = self._factories[key]()
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._factories)
+
+    def __len__(self):
+        return len(self._factories)
+
+    def __repr__(self):
+        return f"LazyMapping({list(self._factories)})"
+
+
+def scan_source(path: Path, source: Optional[bytes] = None) -> Tuple[Optional[str], Set[str]]:
+    """
+    Statically inspect a module file without executing it.
+
+    Returns the literal `__virtualname__` (if any) and the names bound at the
+    top level of the module. A star import adds "*" to the names since we can't
+    know what it brings in. `source` is read from `path` when not given.
+    """
+    tree = ast.parse(path.read_bytes() if source is None else source, filename=str(path))
+    virtualname = None
+    names: Set[str] = set()
+
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                if not isinstance(target, ast.Name):
+                    continue
+                names.add(target.id)
+                if (
+                    target.id == "__virtualname__"
+                    and isinstance(node.value, ast.Constant)
+                    and isinstance(node.value.value, str)
+                ):
+                    virtualname = node.value.value
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                names.add(alias.asname or alias.name.split(".")[0])
+
+    return virtualname, names
+
+
+def capture_source(path: Path) -> Source:
+    with open(path, "rb") as file:
+        return os.fstat(file.fileno()), file.read()
+
+
+class SnapshotSourceLoader(importlib.machinery.SourceFileLoader):
+    """
+    Executes the source captured when the module was registered, instead of whatever
+    is on disk by the time a lazy module runs. The bytecode cache is used as long as
+    it matches the captured source.
+    """
+
+    def __init__(self, fullname: str, path: Path, source: Source):
+        super().__init__(fullname, str(path))
+        self.stat, self.source = source
+
+    def get_data(self, path: str) -> bytes:
+        if path == self.path:
+            return self.source
+        return super().get_data(path)
+
+    def path_stats(self, path: str) -> dict:
+        return {"mtime": self.stat.st_mtime, "size": self.stat.st_size}
+
+    def get_code(self, fullname: str):
+        if time.time() - self.stat.st_mtime < RACY_BYTECODE_SECONDS:
+            return self.source_to_code(self.source, self.path)
+        return super().get_code(fullname)
+
+
+class _LazyModule(ModuleType):
+    """
+    Module that executes on its first attribute access, see `ThreadSafeLazyLoader`.
+    """
+
+    def __getattribute__(self, attr):
+        spec = object.__getattribute__(self, "__spec__")
+        state = spec.loader_state
+        with state["lock"]:
+            if object.__getattribute__(self, "__class__") is _LazyModule:
+                # Accesses from the module's own code, or an import cycle, in this thread
+                if state["loading"]:
+                    return object.__getattribute__(self, attr)
+                state["loading"] = True
+
+                # Attributes set on the module before it executed are kept
+                module_dict = object.__getattribute__(self, "__dict__")
+                before = state["__dict__"]
+                updated = {
+                    key: value
+                    for key, value in module_dict.items()
+                    if key not in before or before[key] is not value
+                }
+                spec.loader.exec_module(self)
+                if sys.modules.get(spec.name, self) is not self:
+                    raise ValueError(
+                        f"module object for {spec.name!r} substituted in sys.modules "
+                        "during a lazy load"
+                    )
+                module_dict.update(updated)
+                self.__class__ = ModuleType
 
-class Definition:
-    """Loads in a single plugin directory and its submodules for lazy loading."""
+        return getattr(self, attr)
+
+    def __delattr__(self, attr):
+        self.__getattribute__(attr)
+        delattr(self, attr)
+
+
+class ThreadSafeLazyLoader(importlib.util.LazyLoader):
+    """
+    `importlib.util.LazyLoader` as it behaves from Python 3.12 on: threads racing for
+    the first attribute access wait until the module finished executing. Before 3.12
+    the others see it half executed and fail with AttributeErrors.
+    """
+
+    def exec_module(self, module: ModuleType):
+        module.__spec__.loader = self.loader
+        module.__loader__ = self.loader
+        module.__spec__.loader_state = {
+            "__dict__": module.__dict__.copy(),
+            "lock": threading.RLock(),
+            "loading": False,
+        }
+        module.__class__ = _LazyModule
+
+
+def _remove_modules(modules: Dict[str, ModuleType]):
+    for module_name, module in list(modules.items()):
+        # Only our own entry, another loader may have registered the name since
+        if sys.modules.get(module_name) is module:
+            del sys.modules[module_name]
+
+
+class ModuleNamespace:
+    """
+    The modules one plugin load registered in sys.modules, shared with its copies.
+
+    An owned namespace is private to the load, its entries are removed from
+    sys.modules once no definition refers to it anymore.
+    """
+
+    def __init__(self, root: str, owned: bool = False):
+        self.root = root
+        self.modules: Dict[str, ModuleType] = {}
+        if owned:
+            finalizer = weakref.finalize(self, _remove_modules, self.modules)
+            finalizer.atexit = False
+
+    def register(self, module_name: str, module: ModuleType):
+        sys.modules[module_name] = module
+        self.modules[module_name] = module
 
-    def __init__(self, base_path):
+    def unload(self):
+        _remove_modules(self.modules)
+
+
+def load_definition_classes(path) -> Dict[str, type]:
+    """
+    Imports a definitions package (e.g. `.definitions/definitions`) and returns the
+    classes listed in its `definitions` variable by name.
+    """
+    path = Path(path)
+    init_file = path / "__init__.py" if path.is_dir() else path
+    module_name = f"_definitions_{path.resolve().parent.name}_{path.stem}"
+
+    spec = importlib.util.spec_from_file_location(module_name, init_file)
+    if not spec or not spec.loader:
+        raise ImportError(f"Could not load definitions from '{path}'.")
+
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return {cls.__name__: cls for cls in getattr(module, "definitions", [])}
+
+
+class Definition:
+    """
+    Loads in a single plugin directory and its submodules for lazy loading.
+
+    Modules are registered in sys.modules under `module_namespace`, the directory
+    name prefixed with `module_prefix`. A unique prefix gives the load a private
+    namespace, removed from sys.modules once the definition is garbage collected.
+    Callables are always resolved through the definition's own module objects, and
+    every module executes the source captured when it was registered.
+
+    Given the `previous` load of the same plugin, the definition is built copy-on-write:
+    the module objects of unchanged files are carried over, only changed and added files
+    get fresh lazy modules and the packages above them get copies to attach those to.
+    The previous definition is left untouched.
+    """
+
+    def __init__(
+        self,
+        base_path,
+        manifest: Optional[ManifestCache] = None,
+        module_prefix: str = "",
+        previous: Optional["Definition"] = None,
+    ):
         if base_path[-1] == "/":
             base_path = base_path[:-1]
 
         self._base_path = base_path
         self.path = Path(base_path)
         self.namespace = base_path.split("/")[-1]
+        self.module_namespace = f"{module_prefix}{self.namespace}"
         self.virtualname = None
+        self.manifest = manifest
 
         self.automations = []
 
+        # submodule -> {fully qualified module name: file}, filled while loading
+        self._registry: Dict[str, Dict[str, Path]] = {}
+
+        # file -> (mtime_ns, size) at the time it was loaded, used by reload_changed()
+        self._stats: Dict[Path, Tuple[int, int]] = {}
+
+        # file -> captured source, module name -> module object of this definition
+        self._sources: Dict[Path, Source] = {}
+        self._loaded: Dict[str, ModuleType] = {}
+        self._namespace = ModuleNamespace(self.module_namespace, owned=bool(module_prefix))
+        # module name -> namespace that created the module object, kept alive with it
+        self._origins: Dict[str, ModuleNamespace] = {}
+
+        # Only set while building from a previous load, see _carry()
+        self._previous: Optional["Definition"] = None
+        self._fresh: Set[str] = set()
+        self._copied: Set[str] = set()
+
+        # Public names of the modules that differ from the previous load
+        self.reloaded: List[str] = []
+
+        # Memoized results of get_automations/get_modules, cleared by invalidate()
+        self._automations: Optional[Mapping[str, Callable]] = None
+        self._modules: Optional[Mapping[str, Dict[str, Callable]]] = None
+
         if not self.path.exists() and not self.path.is_dir():
             raise FileNotFoundError(f"Plugin could not be found at {self._base_path}")
 
-        self._load_plugin()
+        if previous is not None:
+            removed, changed, root_changed = self._plan_carry(previous)
+        try:
+            with span(self.namespace, "plugin_discovery", path=str(self.path)):
+                self._load_plugin()
+        finally:
+            # Holding on to it would keep every earlier generation alive
+            self._previous = None
+
+        if previous is not None:
+            self.reloaded = [
+                *previous._get_removed_names(removed),
+                *self._get_changed_names(changed, root_changed),
+            ]
+
+        if self.manifest is not None:
+            self.manifest.prune(self.path, self._iter_files())
+            self.manifest.save()
 
     def _load_plugin(self):
         """
@@ -36,6 +316,8 @@ class Definition:
         namespace name; otherwise, the plugin directory name is used.
 
         The plugin can then be accessed under the `plugin` namespace, with submodules lazy-loaded.
+        With a manifest the root module is lazy as well and its `__virtualname__` comes from the
+        manifest, so an unchanged plugin doesn't execute any code at all.
         """
         init_file = self.path / "__init__.py"
         if not self.path.is_dir() or not init_file.exists():
@@ -43,18 +325,53 @@ class Definition:
                 f"Plugin '{self.namespace}' is missing or lacks an __init__.py file."
             )
 
-        module_import_path = f"{self.namespace}"
-
-        spec = importlib.util.spec_from_file_location(module_import_path, init_file)  # type: ignore
+        module_import_path = self.module_namespace
+        carried = self._carry(module_import_path, init_file)
+        if carried is not None:
+            self._keep(module_import_path, carried, self._previous._origins)
+            self._stats[init_file] = self._stat(init_file)
+            self.virtualname = self._previous.virtualname
+            self._load_submodules(module_import_path, self.path)
+            return True
+
+        source = self._capture(init_file)
+
+        spec = importlib.util.spec_from_file_location(  # type: ignore
+            module_import_path,
+            init_file,
+            loader=SnapshotSourceLoader(module_import_path, init_file, source),
+        )
         if spec and spec.loader:
+            if is_profiling():
+                spec.loader = ProfiledLoader(spec.loader, module_import_path)
+            if self.manifest is not None:
+                spec.loader = ThreadSafeLazyLoader(spec.loader)
+
             module = importlib.util.module_from_spec(spec)  # type: ignore
-            spec.loader.exec_module(module)
 
-            if self.namespace in sys.modules:
+            if module_import_path in sys.modules:
                 logger.info(f"Reloading plugin '{self.namespace}'")
 
-            sys.modules[self.namespace] = module
-            self._load_submodules(self.namespace, self.path)
+            previous = sys.modules.get(module_import_path)
+            self._namespace.register(module_import_path, module)
+            try:
+                spec.loader.exec_module(module)
+            except BaseException:
+                if previous is not None:
+                    sys.modules[module_import_path] = previous
+                else:
+                    del sys.modules[module_import_path]
+                raise
+
+            self._loaded[module_import_path] = module
+            self._origins[module_import_path] = self._namespace
+            self._stats[init_file] = self._stat(init_file)
+
+            if self.manifest is not None:
+                self.virtualname, _ = self._get_static(init_file)
+            else:
+                self.virtualname = getattr(module, "__virtualname__", None)
+            self._load_submodules(module_import_path, self.path)
 
         else:
             raise ImportError(f"Could not import plugin '{self.namespace}'.")
@@ -62,35 +379,182 @@ class Definition:
         return True
 
     def _load_module_from_file(
-        self, name: str, path: Path, namespace: str = ""
+        self,
+        name: str,
+        path: Path,
+        namespace: str = "",
+        lazy: bool = True,
+        replace: bool = False,
     ) -> ModuleType:
         """
         Load a Python module from a file path, ensuring no overwriting occurs.
 
-        If the module is already registered in sys.modules, it reuses the cached instance.
+        If the module is already registered in sys.modules, it reuses the cached instance,
+        unless `replace` is set, then the new module takes its place in a single step.
+        With `lazy` the module is registered through `importlib.util.LazyLoader`, so the
+        file is only executed on the first attribute access. Built from a previous load,
+        the module object of an unchanged file is carried over instead.
         """
         # Determine fully qualified module name
         module_name = f"{namespace}.{name}" if namespace else name
 
+        carried = self._carry(module_name, path)
+        if carried is not None:
+            self._keep(module_name, carried, self._previous._origins)
+            return carried
+
         # Reuse module if already loaded
-        if module_name in sys.modules:
-            logger.debug(f"Reusing already loaded module: {module_name}")
-            return sys.modules[module_name]
+        if not replace and module_name in sys.modules:
+            logger.debug("Reusing already loaded module: %s", module_name)
+            module = self._loaded[module_name] = sys.modules[module_name]
+            self._origins[module_name] = self._namespace
+            return module
+
+        module = self._create_module(module_name, path, self._capture(path), lazy)
+        logger.debug("Loaded module: %s from %s", module_name, path)
+        return module
 
-        # Load the module from the file
-        spec = importlib.util.spec_from_file_location(module_name, path)
+    def _create_module(
+        self, module_name: str, path: Path, source: Source, lazy: bool = True
+    ) -> ModuleType:
+        spec = importlib.util.spec_from_file_location(
+            module_name,
+            path,
+            loader=SnapshotSourceLoader(module_name, path, source),
+        )
         if not spec or not spec.loader:
-            raise ImportError(f"Could not load module '{name}' from '{path}'.")
+            raise ImportError(f"Could not load module '{module_name}' from '{path}'.")
 
+        if is_profiling():
+            spec.loader = ProfiledLoader(spec.loader, module_name)
+        if lazy:
+            spec.loader = ThreadSafeLazyLoader(spec.loader)
+
+        # Register before executing, the lazy loader checks sys.modules on first access
         module = importlib.util.module_from_spec(spec)
+        self._namespace.register(module_name, module)
         spec.loader.exec_module(module)
+        self._loaded[module_name] = module
+        self._origins[module_name] = self._namespace
+        return module
 
-        # Assign proper name and register in sys.modules
-        module.__name__ = module_name
-        sys.modules[module_name] = module
+    def _previous_name(self, module_name: str) -> str:
+        return f"{self._previous.module_namespace}{module_name[len(self.module_namespace):]}"
 
-        logger.debug(f"Loaded module: {module_name} from {path}")
-        return module
+    def _plan_carry(
+        self, previous: "Definition"
+    ) -> Tuple[Dict[str, str], Dict[str, Tuple[str, Path]], bool]:
+        """
+        Decides which modules of `previous` can be carried over: changed and added files
+        need fresh modules, the packages above them copies that the new ones attach to.
+
+        Returns:
+            The differences to `previous` like `_diff`, changed modules under the new names.
+        """
+        self._previous = previous
+        removed, changed, root_changed = previous._diff()
+
+        def rename(module_name: str) -> str:
+            return f"{self.module_namespace}{module_name[len(previous.module_namespace):]}"
+
+        self._fresh = {rename(module_name) for module_name in changed}
+        if root_changed:
+            self._fresh.add(self.module_namespace)
+
+        self._copied = set()
+        for module_name in map(rename, [*removed, *changed]):
+            while module_name != self.module_namespace:
+                module_name = module_name.rpartition(".")[0]
+                self._copied.add(module_name)
+        self._copied -= self._fresh
+
+        changed = {rename(module_name): value for module_name, value in changed.items()}
+        return removed, changed, root_changed
+
+    def _carry(self, module_name: str, path: Path) -> Optional[ModuleType]:
+        """
+        The module object the previous load has for an unchanged file, a copy of it
+        for a package whose children changed, None when a fresh module is needed.
+        """
+        previous = self._previous
+        if previous is None or module_name in self._fresh:
+            return None
+
+        old_name = self._previous_name(module_name)
+        module = previous._loaded.get(old_name)
+        source = previous._sources.get(path)
+        if module is None or source is None:
+            return None
+
+        self._sources[path] = source
+        if module_name not in self._copied:
+            return module
+
+        if type(module) is _LazyModule:
+            # Never executed, a lazy module of the same source runs it at most once
+            return self._create_module(module_name, path, source)
+        return self._copy_package(module, module_name, old_name)
+
+    def _copy_package(self, module: ModuleType, module_name: str, old_name: str) -> ModuleType:
+        """
+        Copies an executed package without running it again. Its children are left out,
+        the new generation attaches its own.
+        """
+        children = {
+            name.rpartition(".")[2]: child
+            for name, child in self._previous._loaded.items()
+            if name.rpartition(".")[0] == old_name
+        }
+        clone = ModuleType(module_name)
+        clone.__dict__.update(
+            (attr, value)
+            for attr, value in module.__dict__.items()
+            if children.get(attr, None) is not value
+        )
+        clone.__name__ = clone.__package__ = module_name
+        clone.__spec__ = copy.copy(module.__spec__)
+        clone.__spec__.name = module_name
+
+        self._namespace.register(module_name, clone)
+        self._loaded[module_name] = clone
+        self._origins[module_name] = self._namespace
+        return clone
+
+    def _keep(
+        self, module_name: str, module: ModuleType, origins: Dict[str, ModuleNamespace]
+    ):
+        # Copies were registered while they were made, carried objects are aliased
+        if self._loaded.get(module_name) is module:
+            return
+        self._namespace.register(module_name, module)
+        self._loaded[module_name] = module
+        # Its relative imports resolve in the namespace it was created in
+        self._origins[module_name] = origins[self._previous_name(module_name)]
+
+    @staticmethod
+    def _is_attached(module: ModuleType, name: str) -> bool:
+        """
+        Check whether `name` is set on `module` without triggering a lazy load.
+        """
+        return name in object.__getattribute__(module, "__dict__")
+
+    def _capture(self, path: Path) -> Source:
+        source = self._sources[path] = capture_source(path)
+        return source
+
+    def _stat(self, path: Path) -> Tuple[int, int]:
+        # What the registered module was loaded from, the file may have changed since
+        stat = self._sources[path][0] if path in self._sources else path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def _register(self, submodule: str, module_name: str, path: Path):
+        self._registry.setdefault(submodule, {})[module_name] = path
+        self._stats[path] = self._stat(path)
+
+    def _iter_files(self) -> Iterator[Path]:
+        yield self.path / "__init__.py"
+        for files in self._registry.values():
+            yield from files.values()
 
     def _load_submodules(
         self,
@@ -103,7 +567,7 @@ class Definition:
 
         Prevents overwriting of already loaded modules.
         """
-        root_module = sys.modules.get(namespace)
+        root_module = self._loaded.get(namespace)
         if not root_module:
             raise ImportError(
                 f"Root namespace '{namespace}' is not registered in sys.modules."
@@ -114,7 +578,7 @@ class Definition:
 
             # Handle submodule directories
             if submodule_path.is_dir():
-                logger.debug(f"Processing directory submodule: {submodule}")
+                logger.debug("Processing directory submodule: %s", submodule)
 
                 # Load __init__.py if present
                 init_file = submodule_path / "__init__.py"
@@ -126,123 +590,370 @@ class Definition:
                 submodule_module = self._load_module_from_file(
                     submodule, init_file, namespace
                 )
+                self._register(submodule, f"{namespace}.{submodule}", init_file)
 
                 # Attach to root module if not already attached
-                if not hasattr(root_module, submodule):
+                if not self._is_attached(root_module, submodule):
                     setattr(root_module, submodule, submodule_module)
                 else:
                     logger.debug(
-                        f"Submodule '{submodule}' already attached to root module."
+                        "Submodule '%s' already attached to root module.", submodule
                     )
 
-                # Load all .py files in the submodule directory
-                for py_file in submodule_path.glob("*.py"):
+                # Register all .py files in the submodule directory, executed on first use
+                for py_file in sorted(submodule_path.glob("*.py")):
                     if py_file.name == "__init__.py" or not py_file.is_file():
                         continue
 
                     file_name = py_file.stem
-                    logger.debug(f"Loading file {submodule}/{file_name}")
+                    logger.debug("Loading file %s/%s", submodule, file_name)
 
                     loaded_module = self._load_module_from_file(
                         file_name, py_file, f"{namespace}.{submodule}"
                     )
+                    self._register(
+                        submodule, f"{namespace}.{submodule}.{file_name}", py_file
+                    )
 
                     # Attach to submodule if not already attached
-                    if not hasattr(submodule_module, file_name):
+                    if not self._is_attached(submodule_module, file_name):
                         setattr(submodule_module, file_name, loaded_module)
                     else:
                         logger.debug(
-                            f"File '{file_name}' already attached to submodule '{submodule}'."
+                            "File '%s' already attached to submodule '%s'.",
+                            file_name,
+                            submodule,
                         )
 
             # Handle single-file modules
             else:
-                logger.debug(f"Processing single-file submodule: {submodule}")
+                logger.debug("Processing single-file submodule: %s", submodule)
                 module_file = plugin_path / f"{submodule}.py"
                 if module_file.exists() and module_file.is_file():
                     submodule_module = self._load_module_from_file(
                         submodule, module_file, namespace
                     )
+                    self._register(submodule, f"{namespace}.{submodule}", module_file)
 
                     # Attach to root module if not already attached
-                    if not hasattr(root_module, submodule):
+                    if not self._is_attached(root_module, submodule):
                         setattr(root_module, submodule, submodule_module)
                     else:
                         logger.debug(
-                            f"Submodule '{submodule}' already attached to root module."
+                            "Submodule '%s' already attached to root module.", submodule
                         )
                 else:
                     logger.warning(
                         f"Submodule '{submodule}' not found at expected path."
                     )
 
-    def get_root(self):
-        return sys.modules[self.namespace]
+    def _discover(self) -> Dict[str, Tuple[str, Path]]:
+        """
+        Maps every module name the plugin layout currently provides to its submodule
+        and file, without loading anything.
+        """
+        found = {}
+        for submodule in SUB_MODULE_NAMES:
+            submodule_path = self.path / submodule
+            if submodule_path.is_dir():
+                init_file = submodule_path / "__init__.py"
+                if not init_file.exists():
+                    continue
+                found[f"{self.module_namespace}.{submodule}"] = (submodule, init_file)
+                for py_file in sorted(submodule_path.glob("*.py")):
+                    if py_file.name == "__init__.py" or not py_file.is_file():
+                        continue
+                    module_name = f"{self.module_namespace}.{submodule}.{py_file.stem}"
+                    found[module_name] = (submodule, py_file)
+            elif (module_file := self.path / f"{submodule}.py").is_file():
+                found[f"{self.module_namespace}.{submodule}"] = (submodule, module_file)
+        return found
+
+    def _has_changed(self, path: Path) -> bool:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return True
+        return self._stats.get(path) != (stat.st_mtime_ns, stat.st_size)
+
+    def _reload_module(self, submodule: str, module_name: str, path: Path):
+        """
+        Replaces a single module with a fresh (lazy) copy of its file and re-attaches it
+        to its parent. The children of a package are carried over to the new object.
+        """
+        parent_name, _, attr = module_name.rpartition(".")
+        # Swapped in place, concurrent lookups never find the module missing
+        module = self._load_module_from_file(attr, path, parent_name, replace=True)
+        self._register(submodule, module_name, path)
+        setattr(self._loaded[parent_name], attr, module)
+
+        for child_name in self._registry[submodule]:
+            parent, _, child = child_name.rpartition(".")
+            if parent == module_name and child_name in self._loaded:
+                setattr(module, child, self._loaded[child_name])
+
+    def _unload_module(self, submodule: str, module_name: str):
+        parent_name, _, attr = module_name.rpartition(".")
+        path = self._registry[submodule].pop(module_name)
+        self._stats.pop(path, None)
+        self._sources.pop(path, None)
+        self._loaded.pop(module_name, None)
+        self._origins.pop(module_name, None)
+        sys.modules.pop(module_name, None)
+        if parent := self._loaded.get(parent_name):
+            # Popping straight from __dict__ so a lazy parent isn't loaded for this
+            object.__getattribute__(parent, "__dict__").pop(attr, None)
+
+    def _diff(self) -> Tuple[Dict[str, str], Dict[str, Tuple[str, Path]], bool]:
+        """
+        Compares the files on disk with what was loaded.
+
+        Returns:
+            The removed modules with their submodule, the added or changed modules with
+            their submodule and file, and whether the root `__init__.py` changed.
+        """
+        current = self._discover()
+        known = {
+            module_name: submodule
+            for submodule, files in self._registry.items()
+            for module_name in files
+        }
+        removed = {name: known[name] for name in known.keys() - current.keys()}
+        changed = {
+            module_name: (submodule, path)
+            for module_name, (submodule, path) in current.items()
+            if module_name not in known or self._has_changed(path)
+        }
+        return removed, changed, self._has_changed(self.path / "__init__.py")
+
+    def _bare_name(self, module_name: str) -> str:
+        return f"{self.namespace}{module_name[len(self.module_namespace):]}"
+
+    def get_bare_modules(self) -> Dict[str, ModuleType]:
+        """
+        The module objects of this definition by their name without the namespace
+        prefix, e.g. `myplug.modules.helper`, without loading anything.
+        """
+        return {self._bare_name(name): module for name, module in self._loaded.items()}
+
+    def has_changed(self) -> bool:
+        """
+        Whether any file of the plugin was added, changed or removed since it was
+        loaded, without reloading anything.
+        """
+        removed, changed, root_changed = self._diff()
+        return bool(removed or changed or root_changed)
+
+    def _get_removed_names(self, removed: Dict[str, str]) -> List[str]:
+        # Named while this definition still has their sources
+        return [
+            self._get_name(module_name, self._registry[submodule][module_name])
+            for module_name, submodule in removed.items()
+        ]
+
+    def _get_changed_names(
+        self, changed: Dict[str, Tuple[str, Path]], root_changed: bool
+    ) -> List[str]:
+        names = [self._get_name(module_name, path) for module_name, (_, path) in changed.items()]
+        if root_changed:
+            names.append(self.virtualname or self.namespace)
+        return names
+
+    def reload_changed(self) -> List[str]:
+        """
+        Reloads only the modules whose files were added, changed or removed since they
+        were loaded. Untouched modules keep their objects and state.
+
+        The modules are replaced in place, use `PluginManager.reload_changed` to keep
+        earlier views of the plugin intact.
+
+        Returns:
+            Public names of the modules that were reloaded or removed, as `get_callable`
+            takes them.
+        """
+        removed, changed, root_changed = self._diff()
+        removed_names = self._get_removed_names(removed)
+
+        for module_name, submodule in removed.items():
+            logger.info(f"Removing module '{module_name}'")
+            self._unload_module(submodule, module_name)
 
-    def _get_name(self, module):
-        module_name = module.__name__.split(".")
+        for module_name, (submodule, path) in changed.items():
+            logger.info(f"Reloading module '{module_name}' from {path}")
+            self._reload_module(submodule, module_name, path)
 
-        if self.virtualname:
-            module_name[0] = self.virtualname
+        # A changed root gets a new module object, the submodules are re-attached to it
+        if root_changed:
+            self._load_plugin()
 
-        if module_name[-1] not in SUB_MODULE_NAMES:
-            if hasattr(module, "__virtualname__"):
-                module_name[-1] = getattr(module, "__virtualname__")
+        names = [*removed_names, *self._get_changed_names(changed, root_changed)]
+        if names:
+            self.invalidate()
+        return names
 
-        return ".".join(module_name)
+    def unload(self):
+        """
+        Removes the modules this definition registered from sys.modules, so a plugin
+        loaded later under the same namespace doesn't reuse them. That includes the
+        namespaces of earlier loads it carried modules over from.
+        """
+        namespaces = {id(namespace): namespace for namespace in self._origins.values()}
+        namespaces[id(self._namespace)] = self._namespace
+        for namespace in namespaces.values():
+            namespace.unload()
+
+    def copy(self) -> "Definition":
+        """
+        Copy with its own registry and memoized mappings, sharing the module objects.
+        """
+        clone = copy.copy(self)
+        clone._registry = {submodule: dict(files) for submodule, files in self._registry.items()}
+        clone._stats = dict(self._stats)
+        clone._sources = dict(self._sources)
+        clone._loaded = dict(self._loaded)
+        clone._origins = dict(self._origins)
+        clone.invalidate()
+        return clone
+
+    def get_root(self):
+        return self._loaded[self.module_namespace]
+
+    def _scan(self, path: Path) -> Tuple[Optional[str], bool]:
+        virtualname, names = scan_source(path, self._get_source(path))
+        return virtualname, "main" in names or "*" in names
+
+    def _get_static(self, path: Path) -> Tuple[Optional[str], bool]:
+        """
+        The `__virtualname__` of a file and whether it defines `main`, read without
+        executing it. Answered from the manifest when one is configured.
+        """
+        if self.manifest is None:
+            return self._scan(path)
+        entry = self.manifest.get(path, partial(self._scan, path), self._sources.get(path))
+        return entry["virtualname"], entry["main"]
+
+    def _get_name(self, module_name: str, path: Path) -> str:
+        """
+        Public name of a registered module, taking the plugin and module
+        `__virtualname__` into account. Read statically so nothing gets executed.
+        """
+        name = module_name.split(".")
+        name[0] = self.virtualname or self.namespace
+
+        if name[-1] not in SUB_MODULE_NAMES:
+            virtualname, _ = self._get_static(path)
+            if virtualname:
+                name[-1] = virtualname
+
+        return ".".join(name)
+
+    def _get_source(self, path: Path) -> Optional[bytes]:
+        source = self._sources.get(path)
+        return source[1] if source else None
+
+    def _iter_registered(self, submodule: str) -> Iterator[Tuple[str, str, Path]]:
+        for module_name, path in self._registry.get(submodule, {}).items():
+            if DUNDER_PATTERN.match(module_name.split(".")[-1]):
+                continue
+            yield self._get_name(module_name, path), module_name, path
+
+    def _get_main_function(self, module_name: str) -> Optional[Callable]:
+        # The module may have been removed by a reload since it was listed
+        if callable := getattr(self._loaded.get(module_name), "main", None):
+            return callable
+        return None
+
+    def _get_functions(self, module_name: str) -> Dict[str, Callable]:
+        module = self._loaded.get(module_name)
+        if module is None:
+            return {}
+        logger.debug("Calling Gathering Functions from %s using Dir", module)
+        return {f: getattr(module, f) for f in dir(module) if callable(getattr(module, f))}
+
+    def invalidate(self):
+        """
+        Drops the memoized automation and module mappings, e.g. after a reload.
+        """
+        self._automations = None
+        self._modules = None
 
-    # TODO(Marc) Maybe Cache these results also counts for get_modules
-    def get_automations(self) -> Dict[str, Callable]:
+    def get_automations(self) -> Mapping[str, Callable]:
         """
-        list_automations _summary_
+        Collects the `main` callable of every automation.
+
+        Names are resolved without executing anything, the automation file itself
+        is only executed when its callable is looked up.
 
         Returns:
-            _description_
+            Mapping of automation name to its `main` callable.
         """
+        if self._automations is not None:
+            return self._automations
+
         callables = {}
+        for name, module_name, path in self._iter_registered("automations"):
+            if self._defines_main(module_name, path):
+                callables[name] = partial(self._get_main_function, module_name)
 
-        def get_main_function(module):
-            if callable := getattr(module, "main", None):
-                return callable
+        if self.manifest is not None:
+            self.manifest.save()
+        self._automations = LazyMapping(callables)
+        return self._automations
 
-        root_module = getattr(self.get_root(), "automations", None)
-        if root_module:
-            if callable := get_main_function(root_module):
-                callables[self._get_name(root_module)] = callable
+    def _defines_main(self, module_name: str, path: Path) -> bool:
+        _, main = self._get_static(path)
+        return main
 
-            for attr, submodule in root_module.__dict__.items():
-                if isinstance(submodule, ModuleType) and not re.compile(
-                    r"^__.*__$"
-                ).match(attr):
-                    if callable := get_main_function(submodule):
-                        callables[self._get_name(submodule)] = callable
+    def get_modules(self) -> Mapping[str, Dict[str, Callable]]:
+        """
+        Collects the callables of every module.
 
-        return callables
+        Module names are listed without executing anything, a module is only
+        executed once its callables are looked up.
 
-    def get_modules(self) -> Dict[str, Dict[str, Callable]]:
-        """
-        list_modules
+        Returns:
+            Mapping of module name to a dict of its callables.
         """
-        logger.debug(f"Gathering Modules from {self.namespace}/{self.virtualname}")
+        if self._modules is not None:
+            return self._modules
 
-        def get_functions(module):
-            logger.debug(f"Calling Gathering Functions from {module} using Dir")
-            functions = {
-                f: getattr(module, f)
-                for f in dir(module)
-                if callable(getattr(module, f))
-            }
-            return functions
+        logger.debug("Gathering Modules from %s/%s", self.namespace, self.virtualname)
 
-        modules = getattr(self.get_root(), "modules", None)
         callables = {}
-        if modules:
-            callables[self._get_name(modules)] = get_functions(modules)
-            for attr, submodule in modules.__dict__.items():
-                if isinstance(submodule, ModuleType) and not re.compile(
-                    r"^__.*__$"
-                ).match(attr):
-                    logger.debug(f"Checking {attr} for functions")
-                    callables[self._get_name(submodule)] = get_functions(submodule)
-
-        return callables
+        for name, module_name, _ in self._iter_registered("modules"):
+            logger.debug("Checking %s for functions", module_name)
+            callables[name] = partial(self._get_functions, module_name)
+
+        if self.manifest is not None:
+            self.manifest.save()
+        self._modules = LazyMapping(callables)
+        return self._modules
+
+    def describe_modules(self) -> Dict[str, Dict[str, str]]:
+        """
+        Signatures of the callables of every module, served from the manifest when
+        one is configured so modules that were described before aren't executed.
+
+        Returns:
+            Mapping of module name to a dict of callable name and signature.
+        """
+        described = {}
+        for name, module_name, path in self._iter_registered("modules"):
+            if self.manifest is not None:
+                described[name] = dict(
+                    self.manifest.get_functions(
+                        path,
+                        partial(self._scan, path),
+                        partial(self._loaded.get, module_name),
+                        self._sources.get(path),
+                    )
+                )
+            else:
+                described[name] = {
+                    f: get_signature(obj)
+                    for f, obj in self._get_functions(module_name).items()
+                }
+
+        if self.manifest is not None:
+            self.manifest.save()
+        return described
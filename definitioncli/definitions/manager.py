@@ -1,105 +1,350 @@
+import itertools
+import logging
+import sys
+import threading
+from types import MappingProxyType, ModuleType
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+from definitioncli.profiling import span
+
+from .loader import Definition as Plugin
+from .manifest import ManifestCache
+
+if TYPE_CHECKING:
+    from .watcher import DefinitionWatcher
+
+logger = logging.getLogger(__name__)
+
+# Numbers every manager, its plugins are loaded under a sys.modules prefix of their own
+_manager_ids = itertools.count()
+
+
+class RegistrySnapshot:
+    """
+    Immutable view of the loaded plugins at one point in time.
+
+    A snapshot is never changed after it is published, a reload publishes a new one
+    holding new module objects for the reloaded plugins. The modules of a snapshot
+    are never replaced, so it keeps resolving to the code it was loaded with. Only
+    its index of resolved callables grows, every reader of the snapshot resolves a
+    path to the same callable so concurrent inserts need no lock.
+    """
+
+    __slots__ = ("plugins", "generation", "index")
+
+    def __init__(
+        self,
+        plugins: Dict[str, Plugin],
+        generation: int = 0,
+        index: Optional[Dict[str, Dict[str, Optional[Callable]]]] = None,
+    ):
+        self.plugins: Mapping[str, Plugin] = MappingProxyType(dict(plugins))
+        self.generation = generation
+        # plugin name -> {dotted path: callable}, carried over for unchanged plugins
+        self.index: Dict[str, Dict[str, Optional[Callable]]] = index if index is not None else {}
+
+
 class PluginManager:
     """
     Manages multiple plugins through the lazy plugin loaders
     The plugin manager uses the VirtualName name if defined to access the plugin and its modules
-    """
 
-    _instance = None  # Singleton instance
+    The plugins are published as a `RegistrySnapshot`. Readers resolve against the
+    current snapshot without locking, reloads are serialized, build the next generation
+    of the changed plugins copy-on-write and swap the next snapshot in with a single
+    assignment.
 
-    def __new__(cls, *args, **kwargs):
-        if not cls._instance:
-            cls._instance = super(PluginManager, cls).__new__(cls)
-        return cls._instance
+    Every load of a plugin gets a private namespace in sys.modules, e.g.
+    `_definitioncli3_1_myplug`, so managers never share modules, not even for the same
+    plugin directory. The modules of a replaced load are removed from sys.modules once
+    no snapshot refers to it.
 
-    def __init__(self, *plugin_dirs):
-        if hasattr(self, "_initialized") and self._initialized:
-            return
-        self._initialized = True  # Mark as initialized to avoid re-initializing
+    With `bare_names` the current snapshot is also registered under the plain plugin
+    names, e.g. `myplug.modules.helper`, so plugin code can import its own package by
+    absolute name. Only one manager of a process should use it, the default one does.
+    Without it plugin code imports its own modules relatively.
+    """
+
+    def __init__(
+        self,
+        *plugin_dirs,
+        manifest: Optional[ManifestCache] = None,
+        bare_names: bool = False,
+    ):
+        self.manifest = manifest
+        self.bare_names = bare_names
+        self._reload_lock = threading.Lock()
+        self._module_prefix = f"_definitioncli{next(_manager_ids)}_"
+        self._loads = itertools.count()
+        # Bare module name -> module object this manager registered in sys.modules
+        self._aliases: Dict[str, ModuleType] = {}
 
-        self.plugins = {}
+        plugins = {}
         for plugin_dir in plugin_dirs:
             try:
-                plugin_loader = Plugin(plugin_dir)
+                plugin_loader = self._load(plugin_dir)
                 name = plugin_loader.virtualname or plugin_loader.namespace
-                self.plugins[name] = plugin_loader
+                plugins[name] = plugin_loader
             except Exception as e:
                 logger.error(f"Failed to load plugin at {plugin_dir}: {e}")
                 continue
 
+        self._snapshot = RegistrySnapshot(plugins)
+        self._register_bare_names()
+
+    def _load(self, plugin_dir: str, previous: Optional[Plugin] = None) -> Plugin:
+        module_prefix = f"{self._module_prefix}{next(self._loads)}_"
+        return Plugin(
+            str(plugin_dir),
+            manifest=self.manifest,
+            module_prefix=module_prefix,
+            previous=previous,
+        )
+
+    @property
+    def snapshot(self) -> RegistrySnapshot:
+        """
+        The current snapshot, pass it to `get_callable` to keep several lookups consistent.
+        """
+        return self._snapshot
+
+    @property
+    def plugins(self) -> Mapping[str, Plugin]:
+        return self._snapshot.plugins
+
     def list_plugins(self) -> list[str]:
-        pm = get_plugin_manager()
-        return list(pm.plugins.keys())
+        return list(self._snapshot.plugins.keys())
 
     def get_plugin(self, name: str = "") -> Optional[Plugin]:
-        pm = get_plugin_manager()
+        plugins = self._snapshot.plugins
         if not name:
-            return pm.plugins.get(next(iter(pm.plugins)))
-        return pm.plugins.get(name)
+            return next(iter(plugins.values()), None)
+        return plugins.get(name)
 
-    def get_callable(self, path: str) -> Optional[Callable]:
+    def get_callable(
+        self, path: str, snapshot: Optional[RegistrySnapshot] = None
+    ) -> Optional[Callable]:
         """
         Returns a callable based on a path string formatted as:
         plugin_name.modules.function_name
         plugin_name.modules.module_name.function_name
         plugin_name.automation.automation_name
+
+        Resolved paths are kept in a per plugin index, so repeated lookups are a dict hit.
+        Lookups go against `snapshot`, the current one by default.
         """
-        # Get the PluginManager instance
-        pm = get_plugin_manager()
+        # Read the snapshot once, a concurrent reload can't change it underneath us
+        snapshot = snapshot or self._snapshot
 
         # Split the path and find the plugin
         split_path = path.split(".")
         plugin_name = split_path[0]
-        plugin = pm.plugins.get(plugin_name)
+
+        plugin_index = snapshot.index.get(plugin_name)
+        if plugin_index is not None and path in plugin_index:
+            return plugin_index[path]
+
+        plugin = snapshot.plugins.get(plugin_name)
         if not plugin:
             return None
 
-        # Resolve the callable based on path structure
-        if split_path[1] == "modules":
-            return (
-                plugin.get_modules()
-                .get(".".join(split_path[:-1]), {})
-                .get(split_path[-1])
-            )
-        elif split_path[1] == "automations":
-            return plugin.get_automations().get(path)
-        else:
-            raise ValueError(
-                f"Invalid path structure: {path}, expected 'modules' or 'automations'. within second index."
-            )
+        with span(path, "resolve_callable"):
+            # Resolve the callable based on path structure
+            if split_path[1] == "modules":
+                resolved = (
+                    plugin.get_modules()
+                    .get(".".join(split_path[:-1]), {})
+                    .get(split_path[-1])
+                )
+            elif split_path[1] == "automations":
+                resolved = plugin.get_automations().get(path)
+            else:
+                raise ValueError(
+                    f"Invalid path structure: {path}, expected 'modules' or 'automations'. within second index."
+                )
+
+        snapshot.index.setdefault(plugin_name, {})[path] = resolved
+        return resolved
+
+    def _iter_callables(self, plugin: Plugin) -> Iterator[Tuple[str, Callable]]:
+        yield from plugin.get_automations().items()
+        for module_name, functions in plugin.get_modules().items():
+            for function_name, function in functions.items():
+                yield f"{module_name}.{function_name}", function
 
+    def build_index(self, name: str) -> Dict[str, Callable]:
+        """
+        Eagerly resolves every callable of a plugin into its index.
+        This executes all of the plugin's modules, use it for completion or listings.
+        """
+        snapshot = self._snapshot
+        plugin = snapshot.plugins[name]
+        plugin_index = snapshot.index.setdefault(name, {})
+        plugin_index.update(self._iter_callables(plugin))
+        return {path: c for path, c in plugin_index.items() if c is not None}
+
+    def _publish(self, plugins: Dict[str, Plugin], index: Dict[str, Dict]):
+        # Called with the reload lock held, a single assignment publishes the snapshot
+        self._snapshot = RegistrySnapshot(plugins, self._snapshot.generation + 1, index)
+        self._register_bare_names()
+
+    def _register_bare_names(self, plugins: Optional[Mapping[str, Plugin]] = None):
+        """
+        Points the bare module names at the modules of `plugins`, the current snapshot
+        by default, and drops the names nothing provides anymore.
+        """
+        if not self.bare_names:
+            return
+
+        if plugins is None:
+            plugins = self._snapshot.plugins
+        aliases: Dict[str, ModuleType] = {}
+        for plugin in plugins.values():
+            aliases.update(plugin.get_bare_modules())
+
+        # New names first, an absolute import never finds the module missing
+        sys.modules.update(aliases)
+        for name, module in self._aliases.items():
+            if name not in aliases and sys.modules.get(name) is module:
+                del sys.modules[name]
+        self._aliases = aliases
+
+    def invalidate_plugin(self, name: str):
+        """
+        Drops the resolved callables of a plugin by publishing a snapshot with a fresh copy of it.
+        """
+        with self._reload_lock:
+            current = self._snapshot
+            if name not in current.plugins:
+                return
+            plugins = dict(current.plugins)
+            plugins[name] = plugins[name].copy()
+            index = {key: value for key, value in current.index.items() if key != name}
+            self._publish(plugins, index)
+
+    def reload_changed(self) -> Dict[str, List[str]]:
+        """
+        Reloads every plugin with files that changed on disk.
+
+        The next generation of a changed plugin gets a namespace of its own. It carries
+        the module objects of unchanged files over, only changed and added files get
+        fresh modules. The reloaded plugins are published together in a new snapshot,
+        readers of the previous snapshot keep resolving to the previous modules.
+
+        Returns:
+            Mapping of plugin name to the public names of its changed modules, as
+            `get_callable` takes them.
+        """
+        with self._reload_lock:
+            current = self._snapshot
+            plugins, index, reloaded = {}, {}, {}
+            for name, plugin in current.plugins.items():
+                candidate = None
+                try:
+                    if plugin.has_changed():
+                        candidate = self._load(plugin.path, previous=plugin)
+                except Exception as e:
+                    logger.error(f"Failed to reload plugin '{name}': {e}")
+
+                if candidate is None:
+                    plugins[name] = plugin
+                    if name in current.index:
+                        index[name] = current.index[name]
+                    continue
+
+                # The root may have changed its __virtualname__
+                new_name = candidate.virtualname or candidate.namespace
+                plugins[new_name] = candidate
+                reloaded[new_name] = candidate.reloaded
+
+            if reloaded:
+                self._publish(plugins, index)
+        return reloaded
+
+    def close(self):
+        """
+        Unloads the modules of every plugin, the manager must not be used afterwards.
+        Modules of older snapshots are removed once those are garbage collected.
+        """
+        with self._reload_lock:
+            self._register_bare_names({})
+            for plugin in self._snapshot.plugins.values():
+                plugin.unload()
+
+    def watch(self, interval: float = 1.0) -> "DefinitionWatcher":
+        """
+        Starts a background watcher that reloads changed definition files.
+        Uses inotify where available and polls every `interval` seconds otherwise.
+        """
+        # Only watching needs ctypes, keep it out of the CLI start-up
+        from .watcher import DefinitionWatcher
+
+        watcher = DefinitionWatcher(
+            self.reload_changed,
+            [plugin.path for plugin in self._snapshot.plugins.values()],
+            interval=interval,
+        )
+        watcher.start()
+        return watcher
 
+
+# Process-wide default manager used by the CLI, other managers can be created freely
 _plugin_manager_instance = None
+_plugin_manager_lock = threading.Lock()
 
 
-def setup_plugin_manager(*plugin_dirs: str) -> PluginManager:
+def setup_plugin_manager(
+    *plugin_dirs: str, manifest: Optional[ManifestCache] = None
+) -> PluginManager:
     """
-    Initializes the PluginManager instance with the specified plugin directories.
+    Initializes the default PluginManager instance with the specified plugin directories.
+    Its plugins are importable under their plain names, see `PluginManager`.
 
     Args:
         plugin_dirs (List[str]): List of directories where plugins are located.
+        manifest (ManifestCache): Optional manifest cache used to describe plugins
+            without executing unchanged plugin code.
 
     Returns:
         PluginManager: The initialized PluginManager instance.
     """
     global _plugin_manager_instance
-    if _plugin_manager_instance is None:
-        if not plugin_dirs:
-            raise RuntimeError(
-                "plugin_dirs cannot be empty. Provide at least one directory."
+    with _plugin_manager_lock:
+        if _plugin_manager_instance is None:
+            if not plugin_dirs:
+                raise RuntimeError(
+                    "plugin_dirs cannot be empty. Provide at least one directory."
+                )
+            _plugin_manager_instance = PluginManager(
+                *plugin_dirs, manifest=manifest, bare_names=True
             )
-        _plugin_manager_instance = PluginManager(*plugin_dirs)
 
     return _plugin_manager_instance
 
 
 def teardown_plugin_manager():
+    """
+    Closes the default PluginManager, unloading its plugin modules, and forgets it.
+    """
     global _plugin_manager_instance
-    _plugin_manager_instance = None
+    with _plugin_manager_lock:
+        if _plugin_manager_instance is not None:
+            _plugin_manager_instance.close()
+        _plugin_manager_instance = None
 
 
 def get_plugin_manager() -> PluginManager:
     """
-    Retrieves the initialized PluginManager instance.
+    Retrieves the default PluginManager instance.
 
     Raises:
         ValueError: If the PluginManager has not been initialized.
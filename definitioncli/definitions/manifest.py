@@ -0,0 +1,228 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 2
+DEFAULT_MANIFEST_PATH = Path.home() / ".cache" / "definitioncli" / "manifest.json"
+
+
+def hash_file(path: Path) -> str:
+    return hash_source(path.read_bytes())
+
+
+def hash_source(source: bytes) -> str:
+    # hashlib and inspect are imported on use, they add measurably to CLI start-up
+    import hashlib
+
+    return hashlib.sha256(source).hexdigest()
+
+
+def get_signature(obj) -> str:
+    """
+    String signature of a callable, builtins without introspection support get `(...)`.
+    """
+    import inspect
+
+    try:
+        return str(inspect.signature(obj))
+    except (TypeError, ValueError):
+        return "(...)"
+
+
+def describe_functions(module) -> Dict[str, str]:
+    """
+    Signatures of the callables of an executed module by name.
+    """
+    functions = {}
+    for name in dir(module):
+        obj = getattr(module, name)
+        if callable(obj):
+            functions[name] = get_signature(obj)
+    return functions
+
+
+class ManifestCache:
+    """
+    Persistent on-disk cache of what every plugin file exposes.
+
+    Entries are keyed on the resolved file path and validated on mtime and size first,
+    falling back to a content hash, so a touched but unchanged file stays a hit.
+    An entry records the module `__virtualname__` and whether it defines an automation
+    `main`, both read from the source without executing it. The signatures of its
+    callables are added once they are asked for, only then is the file executed.
+
+    The cache is shared by every thread resolving callables of a manager, entries are
+    read and written under a lock. Modules are executed outside of it.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else DEFAULT_MANIFEST_PATH
+        self._entries: Dict[str, dict] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        # Serializes writers, so an older copy never replaces a newer file
+        self._save_lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """
+        Reads the manifest from disk, an unreadable or outdated manifest is discarded.
+        """
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable manifest at {self.path}: {e}")
+            return
+
+        if data.get("version") != MANIFEST_VERSION:
+            logger.info(f"Discarding manifest with version {data.get('version')}")
+            return
+
+        with self._lock:
+            self._entries = data.get("files", {})
+
+    def save(self):
+        """
+        Writes the manifest to disk if anything changed, replacing the old file atomically.
+        """
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                entries = {key: dict(entry) for key, entry in self._entries.items()}
+                self._dirty = False
+
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "w", encoding="utf-8") as file:
+                        json.dump({"version": MANIFEST_VERSION, "files": entries}, file)
+                    os.replace(tmp_path, self.path)
+                except BaseException:
+                    os.unlink(tmp_path)
+                    raise
+            except BaseException:
+                with self._lock:
+                    self._dirty = True
+                raise
+
+    def lookup(
+        self, path: Path, source: Optional[Tuple[os.stat_result, bytes]] = None
+    ) -> Optional[dict]:
+        """
+        Returns the cached entry for a file if it is still valid, otherwise None.
+        With `source`, the stat and content the file was loaded with, the entry is
+        validated against those instead of the file on disk.
+        """
+        key = str(Path(path).resolve())
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        stat = source[0] if source else os.stat(key)
+        if entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+            return entry
+
+        digest = hash_source(source[1]) if source else hash_file(Path(key))
+        if entry["sha256"] != digest:
+            return None
+
+        # Same content, only the metadata moved
+        with self._lock:
+            entry["mtime"] = stat.st_mtime
+            entry["size"] = stat.st_size
+            self._dirty = True
+        return entry
+
+    def get(
+        self,
+        path: Path,
+        scan: Callable[[], Tuple[Optional[str], bool]],
+        source: Optional[Tuple[os.stat_result, bytes]] = None,
+    ) -> dict:
+        """
+        Returns the entry for a file, scanning its source to build it on a miss.
+
+        Parameters:
+            path (Path): File the module was loaded from.
+            scan (Callable): Returns the `__virtualname__` and whether `main` is
+                defined, read statically. Only called on a miss.
+            source (tuple): Stat and content the module was loaded with, read from
+                `path` when not given.
+
+        Returns:
+            dict: The manifest entry, its `functions` are None until described.
+        """
+        entry = self.lookup(path, source)
+        if entry is not None:
+            return entry
+
+        logger.debug("Manifest miss for %s, scanning it", path)
+        virtualname, main = scan()
+        entry = self.build_entry(path, virtualname, main, source)
+        with self._lock:
+            self._entries[str(Path(path).resolve())] = entry
+            self._dirty = True
+        return entry
+
+    def get_functions(
+        self,
+        path: Path,
+        scan: Callable[[], Tuple[Optional[str], bool]],
+        load_module: Callable[[], ModuleType],
+        source: Optional[Tuple[os.stat_result, bytes]] = None,
+    ) -> Dict[str, str]:
+        """
+        Returns the signatures of the callables of a file, executing its module to
+        describe them when the entry has none yet. See `get` for the parameters.
+        """
+        entry = self.get(path, scan, source)
+        if entry["functions"] is not None:
+            return entry["functions"]
+
+        logger.debug("Describing %s, executing it", path)
+        functions = describe_functions(load_module())
+        with self._lock:
+            entry["functions"] = functions
+            self._dirty = True
+        return functions
+
+    @staticmethod
+    def build_entry(
+        path: Path,
+        virtualname: Optional[str],
+        main: bool,
+        source: Optional[Tuple[os.stat_result, bytes]] = None,
+    ) -> dict:
+        stat = source[0] if source else os.stat(path)
+        return {
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+            "sha256": hash_source(source[1]) if source else hash_file(Path(path)),
+            "virtualname": virtualname,
+            "main": main,
+            "functions": None,
+        }
+
+    def prune(self, root: Path, paths):
+        """
+        Drops every entry below `root` that isn't one of `paths`, e.g. files that were removed.
+        """
+        root = Path(root).resolve()
+        keep = {str(Path(path).resolve()) for path in paths}
+        with self._lock:
+            for key in list(self._entries):
+                if Path(key).is_relative_to(root) and key not in keep:
+                    del self._entries[key]
+                    self._dirty = True
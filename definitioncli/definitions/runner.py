@@ -0,0 +1,406 @@
+import contextlib
+import io
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from multiprocessing.connection import wait as wait_connections
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from .manager import PluginManager, get_plugin_manager
+
+logger = logging.getLogger(__name__)
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_TIMEOUT = "timeout"
+STATUS_CANCELLED = "cancelled"
+STATUS_NOT_FOUND = "not_found"
+
+MODE_PROCESS = "process"
+MODE_THREAD = "thread"
+
+# How often the scheduler wakes up to check deadlines and cancellation
+POLL_INTERVAL = 0.05
+
+
+class AutomationResult(NamedTuple):
+    """
+    Outcome of a single automation run, `value` is what its `main` returned.
+    """
+
+    path: str
+    status: str
+    value: Any = None
+    error: Optional[str] = None
+    traceback: Optional[str] = None
+    logs: Optional[List[dict]] = None
+    output: str = ""
+    duration: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == STATUS_OK
+
+
+class _LogCapture(logging.Handler):
+    """
+    Collects the log records of one automation, optionally only those of one thread.
+    """
+
+    def __init__(self, thread_id: Optional[int] = None):
+        super().__init__()
+        self.thread_id = thread_id
+        self.records: List[dict] = []
+
+    def emit(self, record: logging.LogRecord):
+        if self.thread_id is not None and record.thread != self.thread_id:
+            return
+        try:
+            self.records.append(
+                {
+                    "level": record.levelname,
+                    "logger": record.name,
+                    "message": record.getMessage(),
+                    "created": record.created,
+                }
+            )
+        except Exception:
+            self.handleError(record)
+
+
+class _ThreadRoutedStream:
+    """
+    Stands in for stdout/stderr while automations run on threads, so every thread
+    writes into its own buffer and everything else reaches the original stream.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffers: Dict[int, io.StringIO] = {}
+
+    def write(self, text: str) -> int:
+        return self.buffers.get(threading.get_ident(), self.stream).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self, attr):
+        return getattr(self.stream, attr)
+
+
+def validate_path(path: str):
+    split_path = path.split(".")
+    if len(split_path) < 3 or split_path[1] != "automations":
+        raise ValueError(
+            f"Invalid automation path: {path}, expected 'plugin.automations.name'."
+        )
+
+
+def _execute(
+    manager: PluginManager, path: str, thread_id: Optional[int] = None
+) -> dict:
+    """
+    Resolves and calls an automation, never raising. Runs in the worker.
+    """
+    capture = _LogCapture(thread_id)
+    root_logger = logging.getLogger()
+    root_logger.addHandler(capture)
+    result = {"path": path, "status": STATUS_OK}
+    start = time.perf_counter()
+    try:
+        func = manager.get_callable(path)
+        if func is None:
+            result.update(status=STATUS_NOT_FOUND, error=f"No automation found at '{path}'")
+        else:
+            result["value"] = func()
+    except Exception as e:
+        result.update(
+            status=STATUS_FAILED,
+            error=f"{type(e).__name__}: {e}",
+            traceback=traceback.format_exc(),
+        )
+    finally:
+        root_logger.removeHandler(capture)
+
+    result.update(duration=time.perf_counter() - start, logs=capture.records)
+    return result
+
+
+def _process_main(
+    conn, plugin_dirs: List[str], path: str, manager: Optional[PluginManager] = None
+):
+    # Entry point of a worker process, forked workers inherit the plugin manager
+    if manager is None:
+        # The only manager of the worker, plugin code may import its package by name
+        manager = PluginManager(*plugin_dirs, bare_names=True)
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        result = _execute(manager, path)
+    result["output"] = output.getvalue()
+
+    try:
+        conn.send(result)
+    except Exception:
+        # The return value can't be pickled, send its representation instead
+        result["value"] = repr(result.get("value"))
+        conn.send(result)
+    finally:
+        conn.close()
+
+
+class AutomationRunner:
+    """
+    Runs automations concurrently, each isolated from the others.
+
+    In process mode every automation runs in its own worker process, at most
+    `workers` at a time, so a crash only fails that automation and a task that
+    exceeds its timeout is terminated. Thread mode avoids the process start-up cost
+    but can't stop a thread: a timed out automation is reported as such and left to
+    finish on its daemon thread in the background, its slot goes to the next one.
+
+    Automations are addressed like `PluginManager.get_callable` resolves them,
+    `plugin_name.automations.automation_name`. Logs and printed output of every run
+    are captured in its result.
+    """
+
+    def __init__(
+        self,
+        manager: Optional[PluginManager] = None,
+        workers: Optional[int] = None,
+        mode: str = MODE_PROCESS,
+        timeout: Optional[float] = None,
+        mp_context: Optional[str] = None,
+    ):
+        if mode not in (MODE_PROCESS, MODE_THREAD):
+            raise ValueError(f"Unknown mode '{mode}', expected '{MODE_PROCESS}' or '{MODE_THREAD}'")
+
+        self.manager = manager or get_plugin_manager()
+        self.workers = workers or os.cpu_count() or 1
+        self.mode = mode
+        self.timeout = timeout
+        self._context = multiprocessing.get_context(mp_context)
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """
+        Stops a running `run`: queued automations are skipped and, in process mode,
+        running ones are terminated. Safe to call from another thread.
+        """
+        self._cancelled.set()
+
+    def expand(self, selection: Iterable[str]) -> List[str]:
+        """
+        Expands plugin names to every automation of that plugin, full paths are kept.
+        """
+        paths = []
+        for item in selection:
+            if "." in item:
+                validate_path(item)
+                paths.append(item)
+                continue
+
+            plugin = self.manager.get_plugin(item)
+            if plugin is None:
+                raise KeyError(f"Unknown plugin '{item}'")
+            paths.extend(plugin.get_automations())
+        return paths
+
+    def run(
+        self, selection: Iterable[str], timeout: Optional[float] = None
+    ) -> List[AutomationResult]:
+        """
+        Runs the selected automations and waits for all of them.
+
+        Parameters:
+            selection (Iterable[str]): Automation paths or plugin names.
+            timeout (float): Seconds every automation may run, defaults to the
+                runner's timeout.
+
+        Returns:
+            List[AutomationResult]: One result per automation, in selection order.
+        """
+        paths = self.expand(selection)
+        timeout = timeout if timeout is not None else self.timeout
+        self._cancelled.clear()
+
+        if self.mode == MODE_PROCESS:
+            results = self._run_processes(paths, timeout)
+        else:
+            results = self._run_threads(paths, timeout)
+
+        failed = sum(1 for result in results if not result.ok)
+        if failed:
+            logger.warning(f"{failed} of {len(results)} automations did not succeed")
+        return results
+
+    def _run_processes(
+        self, paths: List[str], timeout: Optional[float]
+    ) -> List[AutomationResult]:
+        plugin_dirs = [str(plugin.path) for plugin in self.manager.plugins.values()]
+        # Only a forked worker can share the manager, spawned ones load the plugins anew
+        manager = self.manager if self._context.get_start_method() == "fork" else None
+        results: Dict[int, AutomationResult] = {}
+        pending = deque(enumerate(paths))
+        # index -> (process, connection, start time)
+        running: Dict[int, tuple] = {}
+
+        def finish(index: int, result: AutomationResult):
+            process, conn, _ = running.pop(index)
+            conn.close()
+            if process.is_alive():
+                process.terminate()
+            process.join()
+            results[index] = result
+
+        try:
+            while pending or running:
+                if self._cancelled.is_set():
+                    break
+
+                while pending and len(running) < self.workers:
+                    index, path = pending.popleft()
+                    receiver, sender = self._context.Pipe(duplex=False)
+                    process = self._context.Process(
+                        target=_process_main,
+                        args=(sender, plugin_dirs, path, manager),
+                        name=f"automation:{path}",
+                        daemon=True,
+                    )
+                    process.start()
+                    sender.close()
+                    running[index] = (process, receiver, time.perf_counter())
+
+                wait_connections(
+                    [conn for _, conn, _ in running.values()]
+                    + [process.sentinel for process, _, _ in running.values()],
+                    timeout=POLL_INTERVAL,
+                )
+
+                now = time.perf_counter()
+                for index, (process, conn, start) in list(running.items()):
+                    path = paths[index]
+                    if conn.poll():
+                        try:
+                            result = AutomationResult(**conn.recv())
+                        except EOFError:
+                            result = AutomationResult(
+                                path,
+                                STATUS_FAILED,
+                                error=f"Worker exited with code {process.exitcode}",
+                                duration=now - start,
+                            )
+                        finish(index, result)
+                    elif not process.is_alive():
+                        finish(
+                            index,
+                            AutomationResult(
+                                path,
+                                STATUS_FAILED,
+                                error=f"Worker exited with code {process.exitcode}",
+                                duration=now - start,
+                            ),
+                        )
+                    elif timeout is not None and now - start > timeout:
+                        logger.warning(f"Automation '{path}' timed out after {timeout}s")
+                        finish(
+                            index,
+                            AutomationResult(
+                                path,
+                                STATUS_TIMEOUT,
+                                error=f"Timed out after {timeout}s",
+                                duration=now - start,
+                            ),
+                        )
+        finally:
+            # Cancelled, interrupted or failed: nothing may outlive the run
+            for index in list(running):
+                finish(
+                    index,
+                    AutomationResult(paths[index], STATUS_CANCELLED, error="Cancelled"),
+                )
+
+        for index, path in pending:
+            results[index] = AutomationResult(path, STATUS_CANCELLED, error="Cancelled")
+        return [results[index] for index in range(len(paths))]
+
+    def _run_threads(
+        self, paths: List[str], timeout: Optional[float]
+    ) -> List[AutomationResult]:
+        results: Dict[int, AutomationResult] = {}
+        pending = deque(enumerate(paths))
+        # index -> (future, start time), a timed out thread is dropped and frees its slot
+        running: Dict[int, tuple] = {}
+        stdout, stderr = _ThreadRoutedStream(sys.stdout), _ThreadRoutedStream(sys.stderr)
+
+        def work(index: int, future: Future):
+            thread_id = threading.get_ident()
+            output = stdout.buffers[thread_id] = stderr.buffers[thread_id] = io.StringIO()
+            try:
+                result = _execute(self.manager, paths[index], thread_id)
+                future.set_result(AutomationResult(output=output.getvalue(), **result))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                del stdout.buffers[thread_id], stderr.buffers[thread_id]
+
+        sys.stdout, sys.stderr = stdout, stderr
+        try:
+            while (pending or running) and not self._cancelled.is_set():
+                # Every automation gets a daemon thread of its own, a hanging one never
+                # holds up the queue or the interpreter's exit
+                while pending and len(running) < self.workers:
+                    index, path = pending.popleft()
+                    future: Future = Future()
+                    threading.Thread(
+                        target=work,
+                        args=(index, future),
+                        name=f"automation:{path}",
+                        daemon=True,
+                    ).start()
+                    running[index] = (future, time.perf_counter())
+
+                wait(
+                    [future for future, _ in running.values()],
+                    timeout=POLL_INTERVAL,
+                    return_when=FIRST_COMPLETED,
+                )
+
+                now = time.perf_counter()
+                for index, (future, start) in list(running.items()):
+                    if future.done():
+                        del running[index]
+                        results[index] = future.result()
+                    elif timeout is not None and now - start > timeout:
+                        logger.warning(f"Automation '{paths[index]}' timed out after {timeout}s")
+                        del running[index]
+                        results[index] = AutomationResult(
+                            paths[index],
+                            STATUS_TIMEOUT,
+                            error=f"Timed out after {timeout}s",
+                            duration=now - start,
+                        )
+        finally:
+            sys.stdout, sys.stderr = stdout.stream, stderr.stream
+
+        for index, path in enumerate(paths):
+            results.setdefault(index, AutomationResult(path, STATUS_CANCELLED, error="Cancelled"))
+        return [results[index] for index in range(len(paths))]
+
+
+def run_automations(
+    selection: Iterable[str],
+    workers: Optional[int] = None,
+    mode: str = MODE_PROCESS,
+    timeout: Optional[float] = None,
+) -> List[AutomationResult]:
+    """
+    Runs automations of the initialized plugin manager, see `AutomationRunner`.
+    """
+    return AutomationRunner(workers=workers, mode=mode, timeout=timeout).run(selection)
@@ -0,0 +1,201 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Watched subdirectories of a plugin, mirrors SUB_MODULE_NAMES in the loader
+WATCHED_SUBDIRECTORIES = ["automations", "modules"]
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+IN_WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_MOVE_SELF
+)
+
+# struct inotify_event without the trailing name: wd, mask, cookie, len
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class Inotify:
+    """
+    Minimal ctypes binding to Linux inotify, only used to wake up on changes.
+    Events are only decoded to track the watches themselves, the reload does its own
+    mtime comparison.
+    """
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._libc = libc
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        # path -> watch descriptor, an entry is dropped once the kernel ends its watch
+        self._watched: Dict[Path, int] = {}
+
+    @classmethod
+    def available(cls) -> bool:
+        if not sys.platform.startswith("linux"):
+            return False
+        libc = ctypes.util.find_library("c")
+        return bool(libc) and hasattr(ctypes.CDLL(libc), "inotify_init1")
+
+    def watch(self, path: Path):
+        if path in self._watched:
+            return
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), IN_WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), str(path))
+        self._watched[path] = wd
+
+    def _handle(self, data: bytes):
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size + length
+
+            if mask & IN_MOVE_SELF:
+                # The path no longer leads to the watched directory, IN_IGNORED follows
+                self._libc.inotify_rm_watch(self.fd, wd)
+            elif mask & IN_IGNORED:
+                # Deleted or unmounted, a directory recreated at the path is watched anew
+                for path, watched in list(self._watched.items()):
+                    if watched == wd:
+                        del self._watched[path]
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Blocks until an event arrives or `timeout` passes, returns whether anything happened.
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            self._handle(data)
+        return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+class DefinitionWatcher:
+    """
+    Background thread calling `reload` whenever files in the plugin directories change.
+
+    With inotify the thread sleeps until the kernel reports a change, otherwise it
+    polls every `interval` seconds. `reload` is expected to work out what changed itself.
+    """
+
+    def __init__(
+        self,
+        reload: Callable,
+        plugin_paths: Iterable[Path],
+        interval: float = 1.0,
+        use_inotify: Optional[bool] = None,
+    ):
+        self._reload = reload
+        self.plugin_paths = [Path(path) for path in plugin_paths]
+        self.interval = interval
+        self.use_inotify = Inotify.available() if use_inotify is None else use_inotify
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _directories(self) -> List[Path]:
+        directories = []
+        for path in self.plugin_paths:
+            directories.append(path)
+            directories.extend(
+                path / sub for sub in WATCHED_SUBDIRECTORIES if (path / sub).is_dir()
+            )
+        return directories
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="definition-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        inotify = None
+        if self.use_inotify:
+            try:
+                inotify = Inotify()
+            except OSError as e:
+                logger.warning(f"inotify unavailable, falling back to polling: {e}")
+
+        logger.debug(f"Watching {self.plugin_paths} using {'inotify' if inotify else 'polling'}")
+        try:
+            while not self._stop.is_set():
+                if inotify:
+                    # Directories created after start are picked up on the next round
+                    try:
+                        for directory in self._directories():
+                            inotify.watch(directory)
+                    except OSError as e:
+                        logger.warning(f"inotify watch failed, falling back to polling: {e}")
+                        inotify.close()
+                        inotify = None
+                        continue
+                    if not inotify.wait(self.interval):
+                        continue
+                    # Let editors finish writing before reloading
+                    self._stop.wait(0.05)
+                    inotify.wait(0)
+                elif self._stop.wait(self.interval):
+                    break
+
+                try:
+                    if reloaded := self._reload():
+                        logger.info(f"Reloaded definitions: {reloaded}")
+                except Exception as e:
+                    logger.error(f"Failed to reload definitions: {e}")
+        finally:
+            if inotify:
+                inotify.close()
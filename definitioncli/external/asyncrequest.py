@@ -0,0 +1,299 @@
+import asyncio
+import logging
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Optional
+
+from requests import Response
+from requests.exceptions import HTTPError
+
+from definitioncli.external.request import ApiRequest, RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 10
+
+
+class RateLimitGovernor:
+    """
+    Holds requests back when the API reports that the rate limit is (nearly) used up.
+
+    Reads `X-RateLimit-Remaining`/`X-RateLimit-Reset` from every response and waits for
+    the reset once fewer than `reserve` requests are left. A `Retry-After` on a 403 or
+    429 (secondary rate limit) pauses every request, not just the one that hit it.
+    """
+
+    def __init__(self, reserve: int = 10):
+        """
+        Parameters:
+            reserve (int): Number of requests kept in reserve before waiting for the reset.
+        """
+        self.reserve = reserve
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+        self.paused_until = 0.0
+
+    def get_delay(self) -> float:
+        now = time.time()
+        delay = self.paused_until - now
+        if (
+            self.remaining is not None
+            and self.remaining <= self.reserve
+            and self.reset_at > now
+        ):
+            delay = max(delay, self.reset_at - now)
+        return delay
+
+    async def acquire(self):
+        while (delay := self.get_delay()) > 0:
+            logger.info(f"Rate limit reached, waiting {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+        # Count the request up front so concurrent callers see it
+        if self.remaining is not None:
+            self.remaining -= 1
+
+    def update(self, response: Response):
+        headers = response.headers
+        if "X-RateLimit-Remaining" in headers and "X-RateLimit-Reset" in headers:
+            remaining = int(headers["X-RateLimit-Remaining"])
+            reset_at = float(headers["X-RateLimit-Reset"])
+            # Responses arrive out of order, within one window the lowest count wins
+            if reset_at > self.reset_at or self.remaining is None:
+                self.remaining = remaining
+                self.reset_at = reset_at
+            else:
+                self.remaining = min(self.remaining, remaining)
+
+        if response.status_code in (403, 429):
+            retry_after = RetryPolicy.get_retry_after(response)
+            if retry_after is not None:
+                self.paused_until = max(self.paused_until, time.time() + retry_after)
+
+
+class _AsyncState:
+    """
+    State shared by an async client and every endpoint chained from it.
+
+    A semaphore is bound to the event loop it first waits on, so every running loop
+    gets its own and the client can be reused across `asyncio.run` calls.
+    """
+
+    def __init__(self, max_concurrency: int, governor: RateLimitGovernor):
+        self.max_concurrency = max_concurrency
+        self.governor = governor
+        # event loop -> semaphore, dropped together with the loop
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="api-request"
+            )
+        return self._executor
+
+    def close(self):
+        self._semaphores.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+class AsyncApiRequest(object):
+    """
+    Asyncio counterpart of `ApiRequest` with the same attribute chaining interface.
+
+    Requests go through the pooled, retrying `ApiRequest` machinery on a worker pool,
+    with at most `max_concurrency` in flight and a `RateLimitGovernor` in front.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        governor: Optional[RateLimitGovernor] = None,
+        **kwargs,
+    ):
+        """
+        Initialize request with provided keyword arguments.
+
+        Parameters:
+            max_concurrency (int): Maximum number of requests in flight.
+            governor (RateLimitGovernor): Rate limit tracking, a new one by default.
+            **kwargs: Arbitrary keyword arguments containing request details.
+        """
+        kwargs.setdefault("pool_size", max_concurrency)
+        self._request = ApiRequest(**kwargs)
+        self._state = _AsyncState(max_concurrency, governor or RateLimitGovernor())
+
+    @property
+    def url(self) -> str:
+        return self._request.url
+
+    @property
+    def governor(self) -> RateLimitGovernor:
+        return self._state.governor
+
+    def __getattr__(self, resource: str) -> "AsyncApiRequest":
+        """
+        Dynamically handle resource paths as attributes.
+
+        Parameters:
+            resource (str): The API resource name.
+
+        Returns:
+            AsyncApiRequest: A new instance with updated URL, sharing the limits.
+        """
+        if resource.startswith("_"):
+            raise AttributeError(resource)
+
+        child = AsyncApiRequest.__new__(AsyncApiRequest)
+        child._request = getattr(self._request, resource)
+        child._state = self._state
+        return child
+
+    async def _send_request(self, method, params: dict = {}, data: dict = {}):
+        """
+        Send an HTTP request to the API without blocking the event loop.
+
+        Parameters:
+            method (str): HTTP method (GET, POST, etc.).
+            params (dict): Query parameters.
+            data (dict): Request body data.
+
+        Returns:
+            dict: Parsed JSON response.
+        """
+        loop = asyncio.get_running_loop()
+        async with self._state.semaphore:
+            await self._state.governor.acquire()
+            try:
+                resp, result = await loop.run_in_executor(
+                    self._state.executor,
+                    partial(self._request._fetch, method, params=params, data=data),
+                )
+            except HTTPError as e:
+                # Error responses carry the rate limit headers too
+                if e.response is not None:
+                    self._state.governor.update(e.response)
+                raise
+            self._state.governor.update(resp)
+
+        return result
+
+    async def __call__(self, method: str, params: dict = {}, data: dict = {}):
+        return await self._send_request(method, params=params, data=data)
+
+    async def get(self, **kwargs):
+        """
+        Perform a GET request.
+
+        Parameters:
+            params (dict): Query parameters.
+
+        Returns:
+            dict: API response.
+        """
+        return await self._send_request("GET", params=kwargs)
+
+    async def _fetch_page(self, url: str, params: dict):
+        loop = asyncio.get_running_loop()
+        async with self._state.semaphore:
+            await self._state.governor.acquire()
+            resp = await loop.run_in_executor(
+                self._state.executor,
+                partial(self._request._with_url(url)._request, "GET", params=params),
+            )
+            self._state.governor.update(resp)
+
+        page = self._request._parse_response(resp)
+        return page, resp.links.get("next", {}).get("url")
+
+    async def iter(
+        self, items_key: Optional[str] = None, prefetch: bool = False, **kwargs
+    ) -> AsyncIterator:
+        """
+        Asynchronously iterate over every item of a paginated list endpoint.
+
+        Parameters:
+            items_key (str): Key of the list for endpoints that wrap it in an object.
+            prefetch (bool): Fetch the next page while the current one is consumed.
+            **kwargs: Query parameters of the first request, e.g. `per_page`.
+
+        Yields:
+            The items of every page in order.
+        """
+        task = None
+        page, url = await self._fetch_page(self.url, kwargs)
+        try:
+            while True:
+                if url and prefetch:
+                    task = asyncio.ensure_future(self._fetch_page(url, {}))
+
+                for item in ApiRequest.get_page_items(page, items_key):
+                    yield item
+
+                if not url:
+                    break
+                if task is not None:
+                    page, url = await task
+                    task = None
+                else:
+                    # The next link already carries the query parameters
+                    page, url = await self._fetch_page(url, {})
+        finally:
+            if task is not None:
+                task.cancel()
+
+    async def post(self, data: dict = {}):
+        """
+        Perform a POST request.
+
+        Parameters:
+            data (dict): Request body data.
+
+        Returns:
+            dict: API response.
+        """
+        return await self._send_request("POST", data=data)
+
+    async def patch(self, data: dict = {}):
+        """
+        Perform a PATCH request.
+
+        Parameters:
+            data (dict): Request body data.
+
+        Returns:
+            dict: API response.
+        """
+        return await self._send_request("PATCH", data=data)
+
+    def close(self):
+        """
+        Shut down the worker pool, the pooled HTTP sessions stay open.
+        """
+        self._state.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def __str__(self) -> str:
+        return f"{self.url}"
+
+    def __repr__(self):
+        return f"Async Api Request: {self.url}"
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Union
+from urllib.parse import urlencode
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+class CacheEntry:
+    """
+    A cached response body together with the validators needed to revalidate it.
+    """
+
+    __slots__ = ("etag", "last_modified", "body")
+
+    def __init__(self, etag: Optional[str], last_modified: Optional[str], body: bytes):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body = body
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    LRU cache of GET responses used for conditional requests.
+
+    Entries are evicted least recently used first once either `max_entries` or
+    `max_bytes` of cached bodies is exceeded. With a `directory` every entry is
+    mirrored to disk as well, so validators survive between runs.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        directory: Optional[Union[str, Path]] = None,
+    ):
+        """
+        Parameters:
+            max_entries (int): Maximum number of cached responses.
+            max_bytes (int): Maximum total size of the cached bodies.
+            directory (Path): Optional on-disk store.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = Path(directory) if directory else None
+
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._load()
+
+    @staticmethod
+    def make_key(url: str, params: Optional[dict] = None) -> str:
+        if not params:
+            return url
+        return f"{url}?{urlencode(sorted(params.items()), doseq=True)}"
+
+    def _file(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode()).hexdigest()}.cache"
+
+    def _load(self):
+        """
+        Fills the memory cache from disk, oldest first so LRU order is kept.
+        """
+        files = sorted(self.directory.glob("*.cache"), key=lambda f: f.stat().st_mtime)
+        for file in files:
+            try:
+                with open(file, "rb") as fp:
+                    meta = json.loads(fp.readline())
+                    body = fp.read()
+            except (OSError, ValueError) as e:
+                logger.warning(f"Discarding unreadable cache file {file}: {e}")
+                file.unlink(missing_ok=True)
+                continue
+            entry = CacheEntry(meta.get("etag"), meta.get("last_modified"), body)
+            self._insert(meta["key"], entry)
+
+    def _write(self, key: str, entry: CacheEntry):
+        meta = {"key": key, "etag": entry.etag, "last_modified": entry.last_modified}
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                fp.write(json.dumps(meta).encode() + b"\n")
+                fp.write(entry.body)
+            os.replace(tmp_path, self._file(key))
+        except OSError as e:
+            logger.warning(f"Could not write cache entry for {key}: {e}")
+            Path(tmp_path).unlink(missing_ok=True)
+
+    def _insert(self, key: str, entry: CacheEntry):
+        if old := self._entries.pop(key, None):
+            self._size -= len(old.body)
+        self._entries[key] = entry
+        self._size += len(entry.body)
+
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._size > self.max_bytes
+        ):
+            evicted_key, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted.body)
+            if self.directory:
+                self._file(evicted_key).unlink(missing_ok=True)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        if len(entry.body) > self.max_bytes:
+            return
+        with self._lock:
+            self._insert(key, entry)
+            if self.directory and key in self._entries:
+                self._write(key, entry)
+
+    def clear(self):
+        with self._lock:
+            if self.directory:
+                for key in self._entries:
+                    self._file(key).unlink(missing_ok=True)
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,355 @@
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, NamedTuple, Optional, Text, Tuple, Union
+from urllib.parse import quote
+
+from requests.exceptions import HTTPError
+
+from definitioncli.config import get_provider_config
+from definitioncli.external.asyncrequest import DEFAULT_MAX_CONCURRENCY
+
+from .pullrequest import GitHubPullRequest
+from .request import GITHUB_API_URL, AsyncGithubApi
+
+logger = logging.getLogger(__name__)
+
+FILE_MODE = "100644"
+EXECUTABLE_MODE = "100755"
+
+# Text files up to this size travel inline in the tree request, others as separate blobs
+DEFAULT_INLINE_LIMIT = 64 * 1024
+
+
+def get_blob_sha(content: bytes) -> str:
+    """
+    Git object id of a blob, lets unchanged files be recognised without uploading them.
+    """
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+class ChangeSetResult(NamedTuple):
+    """
+    Outcome of a push, `commit` is None when nothing differed from the branch.
+    """
+
+    commit: Optional[str]
+    ref: str
+    created_ref: bool
+    changed: int
+    unchanged: int
+    blobs: int
+    pull_request: Optional[dict]
+
+
+class GitHubChangeSet:
+    """
+    Collects file changes and pushes them to a branch as one commit through the
+    Git Data API, optionally opening a pull request for the branch.
+
+    A push costs a handful of requests however many files it touches: the refs, the
+    parent commit and its tree are read, files identical to the tree are dropped,
+    small text files are sent inline with the new tree and only large or binary
+    files are uploaded as blobs, concurrently. Then one tree, one commit and one ref
+    update are written.
+    """
+
+    def __init__(
+        self,
+        token: Text,
+        owner: Text,
+        repo: Text,
+        base: Text,
+        head: Text,
+        url: str = GITHUB_API_URL,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        inline_limit: int = DEFAULT_INLINE_LIMIT,
+    ):
+        """
+        Parameters:
+            token (str): GitHub token used for Bearer authentication.
+            owner (str): Owner of the repository.
+            repo (str): Name of the repository.
+            base (str): Branch the head branch is created from and the PR targets.
+            head (str): Branch the commit is pushed to, created when missing.
+            url (str): API root, override to point at GitHub Enterprise or a stub.
+            max_concurrency (int): Maximum number of blob uploads in flight.
+            inline_limit (int): Largest text file in bytes sent inline with the tree.
+        """
+        self.token = token
+        self.owner = owner
+        self.repo = repo
+        self.base = base
+        self.head = head
+        self.url = url
+        self.max_concurrency = max_concurrency
+        self.inline_limit = inline_limit
+
+        # repository path -> (content, mode), None marks a deletion
+        self._files: Dict[str, Optional[Tuple[bytes, str]]] = {}
+
+    @classmethod
+    def from_config(
+        cls, token: Text, head: Text, path: Optional[Union[str, Path]] = None, **kwargs
+    ) -> "GitHubChangeSet":
+        """
+        Change set for the owner, repository and branch of the `Provider.git` table
+        of the definitions config.
+        """
+        config = get_provider_config("git", path)
+        return cls(token, config["owner"], config["repo"], config["branch"], head, **kwargs)
+
+    @staticmethod
+    def _normalize_path(path: str) -> str:
+        return str(PurePosixPath(path.replace(os.sep, "/"))).lstrip("/")
+
+    def add(self, path: str, content: Union[str, bytes], mode: str = FILE_MODE):
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        self._files[self._normalize_path(path)] = (content, mode)
+
+    def add_file(self, local_path: Union[str, Path], path: Optional[str] = None):
+        local_path = Path(local_path)
+        mode = EXECUTABLE_MODE if os.access(local_path, os.X_OK) else FILE_MODE
+        self.add(path or local_path.as_posix(), local_path.read_bytes(), mode)
+
+    def add_directory(self, directory: Union[str, Path], prefix: str = ""):
+        """
+        Adds every file below `directory`, placed under `prefix` in the repository.
+        """
+        directory = Path(directory)
+        for local_path in sorted(directory.rglob("*")):
+            if local_path.is_file():
+                relative = local_path.relative_to(directory).as_posix()
+                self.add_file(local_path, f"{prefix}/{relative}" if prefix else relative)
+
+    def delete(self, path: str):
+        self._files[self._normalize_path(path)] = None
+
+    def __len__(self):
+        return len(self._files)
+
+    def _repo(self, api: AsyncGithubApi) -> AsyncGithubApi:
+        return api.repos.__getattr__(self.owner).__getattr__(self.repo)
+
+    async def _get_ref_sha(self, repo: AsyncGithubApi, branch: str) -> Optional[str]:
+        try:
+            ref = await repo.git.ref.heads.__getattr__(branch).get()
+        except HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None
+            raise
+        return ref["object"]["sha"]
+
+    async def _get_tree(
+        self, repo: AsyncGithubApi, tree_sha: str
+    ) -> Tuple[Dict[str, Tuple[str, str]], bool]:
+        tree = await repo.git.trees.__getattr__(tree_sha).get(recursive=1)
+        blobs = {
+            entry["path"]: (entry["sha"], entry["mode"])
+            for entry in tree["tree"]
+            if entry["type"] == "blob"
+        }
+        return blobs, tree.get("truncated", False)
+
+    def _is_inline(self, content: bytes) -> bool:
+        if len(content) > self.inline_limit:
+            return False
+        try:
+            content.decode("utf-8")
+        except UnicodeDecodeError:
+            return False
+        return True
+
+    def _diff(
+        self, existing: Dict[str, Tuple[str, str]], truncated: bool
+    ) -> Tuple[List[dict], List[Tuple[dict, bytes]], int, List[str]]:
+        """
+        Tree entries for every file that differs from the parent tree, together with
+        the entries whose content has to be uploaded as a blob first. Deletions of
+        files a truncated tree doesn't list are returned separately, to be checked.
+        """
+        entries, uploads, unchanged, unverified = [], [], 0, []
+        for path, change in self._files.items():
+            current = existing.get(path)
+
+            if change is None:
+                if current is not None:
+                    entries.append(self._deletion(path, current[1]))
+                elif truncated:
+                    unverified.append(path)
+                continue
+
+            content, mode = change
+            if current == (get_blob_sha(content), mode):
+                unchanged += 1
+                continue
+
+            entry = {"path": path, "mode": mode, "type": "blob"}
+            if self._is_inline(content):
+                entry["content"] = content.decode("utf-8")
+            else:
+                uploads.append((entry, content))
+            entries.append(entry)
+
+        return entries, uploads, unchanged, unverified
+
+    @staticmethod
+    def _deletion(path: str, mode: str = FILE_MODE) -> dict:
+        return {"path": path, "mode": mode, "type": "blob", "sha": None}
+
+    async def _file_exists(self, repo: AsyncGithubApi, path: str, ref: str) -> bool:
+        try:
+            await repo.contents.__getattr__(quote(path)).get(ref=ref)
+        except HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return False
+            raise
+        return True
+
+    async def _verify_deletions(
+        self, repo: AsyncGithubApi, paths: List[str], ref: str
+    ) -> List[dict]:
+        """
+        Deletion entries for the paths that exist at `ref`. Deleting a path the base
+        tree doesn't have fails the whole tree request, so missing ones are skipped.
+        """
+        exists = await asyncio.gather(*(self._file_exists(repo, path, ref) for path in paths))
+        entries = []
+        for path, found in zip(paths, exists):
+            if found:
+                entries.append(self._deletion(path))
+            else:
+                logger.info(f"Not deleting '{path}', it doesn't exist in {self.owner}/{self.repo}")
+        return entries
+
+    async def _create_blob(self, repo: AsyncGithubApi, content: bytes) -> str:
+        blob = await repo.git.blobs.post(
+            data={"content": base64.b64encode(content).decode("ascii"), "encoding": "base64"}
+        )
+        return blob["sha"]
+
+    async def _open_pull_request(
+        self, api: AsyncGithubApi, title: str, body: str, draft: bool
+    ) -> dict:
+        repo = self._repo(api)
+        # Moving the ref already updated an open pull request for the branch
+        open_pulls = await repo.pulls.get(head=f"{self.owner}:{self.head}", state="open")
+        if open_pulls:
+            return open_pulls[0]
+
+        pull_request = GitHubPullRequest(
+            self.token,
+            self.owner,
+            self.repo,
+            title=title,
+            head=self.head,
+            base=self.base,
+            body=body,
+            draft=draft,
+        )
+        return await pull_request._create_pull_request_async(api)
+
+    async def push_async(
+        self,
+        message: str,
+        title: Optional[str] = None,
+        body: str = "",
+        draft: bool = False,
+        api: Optional[AsyncGithubApi] = None,
+    ) -> ChangeSetResult:
+        """
+        Commits the change set on top of the head branch, or of the base branch when
+        the head doesn't exist yet, and points the head branch at the new commit.
+
+        Parameters:
+            message (str): Commit message.
+            title (str): Opens a pull request with this title, unless one is open.
+            body (str): Body of the pull request.
+            draft (bool): Open the pull request as a draft.
+            api (AsyncGithubApi): Client to use, by default one is created and closed.
+
+        Returns:
+            ChangeSetResult: The new commit and what it took to create it.
+        """
+        own_api = api is None
+        if api is None:
+            api = AsyncGithubApi(self.token, max_concurrency=self.max_concurrency, url=self.url)
+
+        try:
+            return await self._push(api, message, title, body, draft)
+        finally:
+            if own_api:
+                api.close()
+
+    async def _push(
+        self,
+        api: AsyncGithubApi,
+        message: str,
+        title: Optional[str],
+        body: str,
+        draft: bool,
+    ) -> ChangeSetResult:
+        repo = self._repo(api)
+        ref = f"refs/heads/{self.head}"
+
+        head_sha, base_sha = await asyncio.gather(
+            self._get_ref_sha(repo, self.head), self._get_ref_sha(repo, self.base)
+        )
+        parent_sha = head_sha or base_sha
+        if parent_sha is None:
+            raise ValueError(f"Base branch '{self.base}' does not exist in {self.owner}/{self.repo}")
+
+        parent = await repo.git.commits.__getattr__(parent_sha).get()
+        existing, truncated = await self._get_tree(repo, parent["tree"]["sha"])
+        entries, uploads, unchanged, unverified = self._diff(existing, truncated)
+        if unverified:
+            entries.extend(await self._verify_deletions(repo, unverified, parent_sha))
+
+        if not entries:
+            logger.info(f"No changes against {self.owner}/{self.repo}@{parent_sha[:7]}")
+            return ChangeSetResult(None, ref, False, 0, unchanged, 0, None)
+
+        shas = await asyncio.gather(*(self._create_blob(repo, content) for _, content in uploads))
+        for (entry, _), sha in zip(uploads, shas):
+            entry["sha"] = sha
+
+        tree = await repo.git.trees.post(
+            data={"base_tree": parent["tree"]["sha"], "tree": entries}
+        )
+        commit = await repo.git.commits.post(
+            data={"message": message, "tree": tree["sha"], "parents": [parent_sha]}
+        )
+
+        if head_sha is None:
+            await repo.git.refs.post(data={"ref": ref, "sha": commit["sha"]})
+        else:
+            await repo.git.refs.heads.__getattr__(self.head).patch(data={"sha": commit["sha"]})
+
+        logger.info(
+            f"Pushed {len(entries)} changes to {self.owner}/{self.repo}@{self.head} "
+            f"as {commit['sha'][:7]}"
+        )
+
+        pull_request = None
+        if title:
+            pull_request = await self._open_pull_request(api, title, body, draft)
+
+        return ChangeSetResult(
+            commit["sha"],
+            ref,
+            head_sha is None,
+            len(entries),
+            unchanged,
+            len(uploads),
+            pull_request,
+        )
+
+    def push(self, message: str, **kwargs) -> ChangeSetResult:
+        """
+        Blocking `push_async`, use the coroutine from within a running event loop.
+        """
+        return asyncio.run(self.push_async(message, **kwargs))
@@ -1,5 +1,6 @@
-from .request import GithubApi
-from typing import Text, Optional
+import asyncio
+from .request import AsyncGithubApi, GithubApi
+from typing import Iterable, List, Text, Optional
 from definitioncli.external.puillrequest import PullRequest
 
 
@@ -32,22 +33,59 @@ class GitHubPullRequest(PullRequest):
         self.draft = draft
         self.issue = issue
 
+    def _payload(self) -> dict:
+        return {
+            "title": self.title,
+            "body": self.body,
+            "head": self.head,
+            "base": self.base,
+            "draft": self.draft,
+            "maintainer_can_modify": self.maintainer_can_modify,
+        }
+
+    def create_pull_request(self):
+        return self._create_pull_request()
+
     def _create_pull_request(self):
         """
         Create a pull request on GitHub.
         """
 
         pullrequest_endpoint = (
-            self._api.__getattr__(self.owner).__getattr__(self.repo).pulls
+            self._api.repos.__getattr__(self.owner).__getattr__(self.repo).pulls
         )
 
-        pullrequest_endpoint.post(
-            data={
-                "title": self.title,
-                "body": self.body,
-                "head": self.head,
-                "base": self.base,
-                "draft": self.draft,
-                "maintainer_can_modify": self.maintainer_can_modify,
-            }
+        return pullrequest_endpoint.post(data=self._payload())
+
+    async def _create_pull_request_async(self, api: AsyncGithubApi):
+        """
+        Create a pull request on GitHub through a shared async client.
+        """
+
+        pullrequest_endpoint = (
+            api.repos.__getattr__(self.owner).__getattr__(self.repo).pulls
         )
+
+        return await pullrequest_endpoint.post(data=self._payload())
+
+
+async def create_pull_requests(
+    api: AsyncGithubApi,
+    pull_requests: Iterable[GitHubPullRequest],
+    return_exceptions: bool = True,
+) -> List:
+    """
+    Create many pull requests concurrently, bounded by the client's concurrency limit.
+
+    Parameters:
+        api (AsyncGithubApi): Client shared by all requests.
+        pull_requests (Iterable[GitHubPullRequest]): Pull requests to open.
+        return_exceptions (bool): Return failures in place instead of raising the first.
+
+    Returns:
+        list: API responses (or exceptions) in the order of `pull_requests`.
+    """
+    return await asyncio.gather(
+        *(pr._create_pull_request_async(api) for pr in pull_requests),
+        return_exceptions=return_exceptions,
+    )
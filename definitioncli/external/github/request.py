@@ -1,21 +1,83 @@
 from typing import Optional
-from definitioncli.external.request import ApiRequest, BearerAuth
+from definitioncli.external.asyncrequest import (
+    DEFAULT_MAX_CONCURRENCY,
+    AsyncApiRequest,
+    RateLimitGovernor,
+)
+from definitioncli.external.cache import ResponseCache
+from definitioncli.external.request import (
+    DEFAULT_POOL_SIZE,
+    ApiRequest,
+    BearerAuth,
+    RetryPolicy,
+)
+
+GITHUB_API_URL = "https://api.github.com"
+GITHUB_HEADERS = {
+    "Accept": "application/vnd.github+json",
+    "X-GitHub-Api-Version": "2022-11-28",
+}
 
 
 class GithubApi(ApiRequest):
 
-    def __init__(self, token):
+    def __init__(
+        self,
+        token,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        retry: Optional[RetryPolicy] = None,
+        url: str = GITHUB_API_URL,
+        cache: Optional[ResponseCache] = None,
+    ):
         """
         Initialize GithubApi with provided keyword arguments.
 
         Parameters:
-            **kwargs: Arbitrary keyword arguments containing request details.
+            token (str): GitHub token used for Bearer authentication.
+            pool_size (int): Maximum number of pooled connections to the API.
+            retry (RetryPolicy): Retry behaviour, defaults to `DEFAULT_RETRY`.
+            url (str): API root, override to point at GitHub Enterprise or a stub.
+            cache (ResponseCache): Enables conditional GET requests, 304s don't
+                count against the rate limit.
+        """
+        super().__init__(
+            url=self.normalize_url(url),
+            authenticate=BearerAuth(token),
+            headers=GITHUB_HEADERS,
+            pool_size=pool_size,
+            retry=retry,
+            cache=cache,
+        )
+
+
+class AsyncGithubApi(AsyncApiRequest):
+
+    def __init__(
+        self,
+        token,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        governor: Optional[RateLimitGovernor] = None,
+        retry: Optional[RetryPolicy] = None,
+        url: str = GITHUB_API_URL,
+        cache: Optional[ResponseCache] = None,
+    ):
+        """
+        Initialize AsyncGithubApi with provided keyword arguments.
+
+        Parameters:
+            token (str): GitHub token used for Bearer authentication.
+            max_concurrency (int): Maximum number of requests in flight.
+            governor (RateLimitGovernor): Rate limit tracking, a new one by default.
+            retry (RetryPolicy): Retry behaviour, defaults to `DEFAULT_RETRY`.
+            url (str): API root, override to point at GitHub Enterprise or a stub.
+            cache (ResponseCache): Enables conditional GET requests.
         """
         super().__init__(
-            url=self.normalize_url("https://api.github.com"),
+            max_concurrency=max_concurrency,
+            governor=governor,
+            url=ApiRequest.normalize_url(url),
             authenticate=BearerAuth(token),
-            headers={
-                "Accept": "application/vnd.github+json",
-                "X-GitHub-Api-Version": "2022-11-28",
-            },
+            headers=GITHUB_HEADERS,
+            retry=retry,
+            cache=cache,
         )
@@ -1,6 +1,146 @@
 import json
-from requests import Response, request
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
 from requests.auth import AuthBase
+from requests.exceptions import ConnectionError, ConnectTimeout, Timeout
+
+from definitioncli.external.cache import CacheEntry, ResponseCache
+from definitioncli.profiling import span
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 10
+
+_sessions: Dict[Tuple[str, int], Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_base_url(url: str) -> str:
+    """
+    Scheme and host of a URL, sessions are shared per base URL.
+    """
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def get_session(url: str, pool_size: int = DEFAULT_POOL_SIZE) -> Session:
+    """
+    Returns the shared keep-alive session for the base URL of `url`.
+
+    Parameters:
+        url (str): Any URL on the host.
+        pool_size (int): Maximum number of pooled connections to the host.
+
+    Returns:
+        requests.Session: The pooled session.
+    """
+    key = (get_base_url(url), pool_size)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[key] = session
+    return session
+
+
+def close_sessions():
+    """
+    Closes every pooled session.
+    """
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+class RetryPolicy:
+    """
+    Decides whether a request is retried and how long to wait before doing so.
+
+    429 responses and connection failures are retried for every method, 5xx responses
+    and read timeouts only for idempotent methods so a POST is never sent twice.
+    Backoff is exponential with full jitter, a `Retry-After` header always wins.
+    """
+
+    IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+    def __init__(
+        self,
+        total: int = 3,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30.0,
+        status_forcelist: Tuple[int, ...] = (500, 502, 503, 504),
+    ):
+        """
+        Parameters:
+            total (int): Maximum number of retries.
+            backoff_factor (float): Base delay in seconds, doubled on every attempt.
+            max_backoff (float): Upper bound of the computed delay.
+            status_forcelist (tuple): Server error codes that are retried.
+        """
+        self.total = total
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.status_forcelist = status_forcelist
+
+    def should_retry_response(self, method: str, response: Response, attempt: int) -> bool:
+        if attempt >= self.total:
+            return False
+        if response.status_code == 429:
+            return True
+        return (
+            response.status_code in self.status_forcelist
+            and method.upper() in self.IDEMPOTENT_METHODS
+        )
+
+    def should_retry_exception(self, method: str, error: Exception, attempt: int) -> bool:
+        if attempt >= self.total:
+            return False
+        if isinstance(error, ConnectTimeout):
+            return True
+        if isinstance(error, (ConnectionError, Timeout)):
+            return method.upper() in self.IDEMPOTENT_METHODS
+        return False
+
+    @staticmethod
+    def get_retry_after(response: Optional[Response]) -> Optional[float]:
+        """
+        Parses a `Retry-After` header given either in seconds or as an HTTP date.
+        """
+        if response is None:
+            return None
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def get_backoff(self, attempt: int, response: Optional[Response] = None) -> float:
+        retry_after = self.get_retry_after(response)
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2**attempt))
+
+
+DEFAULT_RETRY = RetryPolicy()
 
 
 class BearerAuth(AuthBase):
@@ -45,7 +185,10 @@ class ApiRequest(object):
 
         Parameters:
             **kwargs: Arbitrary keyword arguments containing request details.
+                `pool_size` (int) and `retry` (RetryPolicy) configure the shared session,
+                `cache` (ResponseCache) enables conditional GET requests.
         """
+        self.url = kwargs.pop("url")
         self._store = kwargs
 
     @staticmethod
@@ -84,11 +227,19 @@ class ApiRequest(object):
             resource (str): The API resource name.
 
         Returns:
-            ManagedEngineCeRequest: A new instance with updated URL.
+            ApiRequest: A new instance with updated URL, sharing this instance's settings.
         """
-        store = self._store.copy()
-        store["url"] = self.combine_url(store["url"], resource)
-        return ApiRequest(**store)
+        if resource.startswith("__"):
+            raise AttributeError(resource)
+
+        return self._with_url(self.combine_url(self.url, resource))
+
+    def _with_url(self, url: str) -> "ApiRequest":
+        # The settings are never mutated, so the new instance shares them instead of copying
+        child = ApiRequest.__new__(ApiRequest)
+        child.url = url
+        child._store = self._store
+        return child
 
     def _handle_error_response(self, response: Response):
         """
@@ -107,38 +258,151 @@ class ApiRequest(object):
         elif code > 500:
             response.raise_for_status()
 
-    def _send_request(self, method, params: dict = {}, data: dict = {}):
+    def _request(
+        self,
+        method,
+        params: dict = {},
+        data: dict = {},
+        headers: Optional[dict] = None,
+    ) -> Response:
         """
-        Send an HTTP request to the API.
+        Send an HTTP request through the pooled session, retrying according to the policy.
 
         Parameters:
             method (str): HTTP method (GET, POST, etc.).
             params (dict): Query parameters.
             data (dict): Request body data.
+            headers (dict): Extra headers for this request only.
+
+        Returns:
+            requests.Response: The final response.
+        """
+        default_headers = self._store.get("headers", {"Content-Type": "application/json"})
+        headers = {**default_headers, **headers} if headers else default_headers
+        if data and isinstance(data, (dict, list)):
+            # The APIs behind this client expect JSON bodies, not form data
+            data = json.dumps(data).encode("utf-8")
+            headers = {"Content-Type": "application/json", **headers}
+        session = get_session(self.url, self._store.get("pool_size", DEFAULT_POOL_SIZE))
+        retry: RetryPolicy = self._store.get("retry") or DEFAULT_RETRY
+
+        with span(
+            f"{method} {self.url}", "http", method=method, url=self.url
+        ) as request_span:
+            attempt = 0
+            while True:
+                try:
+                    resp: Response = session.request(
+                        method,
+                        self.url,
+                        params=params,
+                        data=data,
+                        verify=self._store.get("verify_ssl", True),
+                        auth=self._store.get("authenticate", None),
+                        headers=headers,
+                        timeout=self._store.get("timeout"),
+                    )
+                except (ConnectionError, Timeout) as e:
+                    if not retry.should_retry_exception(method, e, attempt):
+                        raise
+                    delay = retry.get_backoff(attempt)
+                    logger.debug(
+                        "%s %s failed (%s), retrying in %.2fs", method, self.url, e, delay
+                    )
+                else:
+                    if not retry.should_retry_response(method, resp, attempt):
+                        break
+                    delay = retry.get_backoff(attempt, resp)
+                    logger.debug(
+                        "%s %s returned %s, retrying in %.2fs",
+                        method,
+                        self.url,
+                        resp.status_code,
+                        delay,
+                    )
+                    resp.close()
+
+                time.sleep(delay)
+                attempt += 1
+
+            request_span.set(
+                status=resp.status_code, bytes=len(resp.content), attempts=attempt + 1
+            )
+        return resp
+
+    def _parse_response(self, resp: Response):
+        """
+        Raise on error responses and decode successful ones.
+
+        Parameters:
+            resp (requests.Response): The response object.
 
         Returns:
             dict: Parsed JSON response.
+        """
+        if resp.status_code >= 400:
+            self._handle_error_response(resp)
 
-        Raises:
-            RequestError: If the request fails.
+        elif 200 <= resp.status_code <= 299:
+            # Decode straight from the bytes, json detects the encoding itself
+            return json.loads(resp.content)
+
+    def _fetch(
+        self, method, params: dict = {}, data: dict = {}
+    ) -> Tuple[Response, Any]:
         """
-        headers = self._store.get("headers", {"Content-Type": "application/json"})
+        Send a request and decode it, revalidating GET requests against the response
+        cache when one is configured. A 304 is answered from the cached body.
+
+        Parameters:
+            method (str): HTTP method (GET, POST, etc.).
+            params (dict): Query parameters.
+            data (dict): Request body data.
 
-        resp: Response = request(
+        Returns:
+            tuple: The response and its parsed JSON.
+        """
+        cache: Optional[ResponseCache] = self._store.get("cache")
+        if cache is None or method.upper() != "GET":
+            resp = self._request(method, params=params, data=data)
+            return resp, self._parse_response(resp)
+
+        key = cache.make_key(self.url, params)
+        entry = cache.get(key)
+        resp = self._request(
             method,
-            self._store["url"],
             params=params,
             data=data,
-            verify=self._store["verify_ssl"],
-            auth=self._store.get("authenticate", None),
-            headers=headers,
+            headers=entry.conditional_headers() if entry else None,
         )
 
-        if resp.status_code >= 400:
-            self._handle_error_response(resp)
+        if resp.status_code == 304 and entry is not None:
+            logger.debug("%s %s not modified, serving cached response", method, self.url)
+            return resp, json.loads(entry.body)
 
-        elif 200 <= resp.status_code <= 299:
-            return json.loads(resp.text)
+        result = self._parse_response(resp)
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if resp.status_code == 200 and (etag or last_modified):
+            cache.set(key, CacheEntry(etag, last_modified, resp.content))
+        return resp, result
+
+    def _send_request(self, method, params: dict = {}, data: dict = {}):
+        """
+        Send an HTTP request to the API.
+
+        Parameters:
+            method (str): HTTP method (GET, POST, etc.).
+            params (dict): Query parameters.
+            data (dict): Request body data.
+
+        Returns:
+            dict: Parsed JSON response.
+
+        Raises:
+            RequestError: If the request fails.
+        """
+        return self._fetch(method, params=params, data=data)[1]
 
     def __call__(self, method: str, params: dict = {}, data: dict = {}):
         return self._send_request(method, params=params, data=data)
@@ -155,6 +419,67 @@ class ApiRequest(object):
         """
         return self._send_request("GET", params=kwargs)
 
+    @staticmethod
+    def get_page_items(page, items_key: Optional[str] = None) -> List:
+        """
+        Extract the items of a single page of a list endpoint.
+
+        Parameters:
+            page: Parsed page, either a list or an object holding the list.
+            items_key (str): Key of the list for endpoints that wrap it in an object.
+
+        Returns:
+            list: The items on the page.
+        """
+        if items_key is not None:
+            return page[items_key]
+        if not isinstance(page, list):
+            raise ValueError("Paginated response is not a list, pass items_key.")
+        return page
+
+    def _fetch_page(self, url: str, params: dict) -> Tuple[List, Optional[str]]:
+        resp = self._with_url(url)._request("GET", params=params)
+        page = self._parse_response(resp)
+        return page, resp.links.get("next", {}).get("url")
+
+    def iter(
+        self, items_key: Optional[str] = None, prefetch: bool = False, **kwargs
+    ) -> Iterator:
+        """
+        Iterate over every item of a paginated list endpoint, following the `rel="next"`
+        links of the `Link` header. Only one page is held in memory at a time.
+
+        Parameters:
+            items_key (str): Key of the list for endpoints that wrap it in an object.
+            prefetch (bool): Fetch the next page in the background while the
+                current one is consumed.
+            **kwargs: Query parameters of the first request, e.g. `per_page`.
+
+        Yields:
+            The items of every page in order.
+        """
+        url: Optional[str] = self.url
+        params = kwargs
+
+        if not prefetch:
+            while url:
+                page, url = self._fetch_page(url, params)
+                # The next link already carries the query parameters
+                params = {}
+                yield from self.get_page_items(page, items_key)
+            return
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="api-prefetch") as pool:
+            future = pool.submit(self._fetch_page, url, params)
+            try:
+                while future is not None:
+                    page, url = future.result()
+                    future = pool.submit(self._fetch_page, url, {}) if url else None
+                    yield from self.get_page_items(page, items_key)
+            finally:
+                if future is not None:
+                    future.cancel()
+
     def post(self, data: dict = {}):
         """
         Perform a POST request.
@@ -167,8 +492,20 @@ class ApiRequest(object):
         """
         return self._send_request("POST", data=data)
 
+    def patch(self, data: dict = {}):
+        """
+        Perform a PATCH request.
+
+        Parameters:
+            data (dict): Request body data.
+
+        Returns:
+            dict: API response.
+        """
+        return self._send_request("PATCH", data=data)
+
     def __str__(self) -> str:
-        return f"{self._store['url']}"
+        return f"{self.url}"
 
     def __repr__(self):
-        return f"Api Request: {self._store['url']}"
+        return f"Api Request: {self.url}"
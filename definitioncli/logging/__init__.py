@@ -1,12 +1,65 @@
+import atexit
 import logging
-from .handlers import FileHandler, ConsoleHandler
+import logging.handlers
+import queue
+from typing import Optional
 
+from .handlers import (
+    DEFAULT_BACKUP_COUNT,
+    DEFAULT_MAX_BYTES,
+    ConsoleHandler,
+    FileHandler,
+)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+
+
+def setup_logging(
+    level: int = logging.INFO,
+    filename: str = "logs/app.log",
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    backup_count: int = DEFAULT_BACKUP_COUNT,
+):
+    """
+    Routes the root logger through a queue, the file and console handlers run on a
+    background listener thread so logging never blocks on I/O.
+    Records below `level` are dropped before any message is formatted.
+    """
+    global _listener, _queue_handler
+    teardown_logging()
 
-def setup_logging():
     logger = logging.getLogger()
-    logger.setLevel(logging.DEBUG)
-    file_handler = FileHandler("logs/app.log")
-    logger.addHandler(file_handler)
+    logger.setLevel(level)
+
+    file_handler = FileHandler(filename, max_bytes=max_bytes, backup_count=backup_count)
     console_handler = ConsoleHandler()
-    logger.addHandler(console_handler)
+
+    log_queue = queue.SimpleQueue()
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    logger.addHandler(_queue_handler)
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    _listener.start()
     return logger
+
+
+def teardown_logging():
+    """
+    Flushes the queue, stops the listener and detaches the queue handler.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+
+
+atexit.register(teardown_logging)
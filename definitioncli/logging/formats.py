@@ -1,3 +1,4 @@
+import copy
 import logging
 
 
@@ -13,8 +14,11 @@ class ColoredFormatter(logging.Formatter):
     }
 
     def format(self, record):
+        # Color a copy, the record is shared with the other handlers
         log_color = self.COLORS.get(record.levelname, self.COLORS["RESET"])
         reset_color = self.COLORS["RESET"]
-        record.levelname = f"{log_color}{record.levelname}{reset_color}"
-        record.msg = f"{log_color}{record.msg}{reset_color}"
-        return super().format(record)
+        colored = copy.copy(record)
+        colored.levelname = f"{log_color}{record.levelname}{reset_color}"
+        colored.msg = f"{log_color}{record.getMessage()}{reset_color}"
+        colored.args = None
+        return super().format(colored)
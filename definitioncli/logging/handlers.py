@@ -1,18 +1,37 @@
 import logging
+import logging.handlers
 import sys
 from pathlib import Path
 
 from .formats import ColoredFormatter
 
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
 
-class FileHandler(logging.FileHandler):
-    def __init__(self, filename, mode="a", encoding=None, delay=False):
+
+class FileHandler(logging.handlers.RotatingFileHandler):
+    def __init__(
+        self,
+        filename,
+        mode="a",
+        encoding=None,
+        delay=False,
+        max_bytes=DEFAULT_MAX_BYTES,
+        backup_count=DEFAULT_BACKUP_COUNT,
+    ):
         # Ensure the directory exists
         log_path = Path(filename)
         log_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Initialize the file handler
-        super().__init__(filename, mode=mode, encoding=encoding, delay=delay)
+        # Initialize the file handler, rotating once the file reaches max_bytes
+        super().__init__(
+            filename,
+            mode=mode,
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding=encoding,
+            delay=delay,
+        )
 
         # Set a standard formatter without colors for the file handler
         formatter = logging.Formatter(
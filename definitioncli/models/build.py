@@ -0,0 +1,210 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Union
+
+from definitioncli.models.terraform import (
+    MODULE_SEPARATOR,
+    MODULE_TEMPLATE,
+    TerraformModule,
+    render_modules,
+)
+from definitioncli.templates import get_jinja2_env
+from definitioncli.utils import BatchFileWriter
+
+logger = logging.getLogger(__name__)
+
+# 2 keys the outputs by their resolved path
+BUILD_STATE_VERSION = 2
+DEFAULT_TARGET = "main.tf"
+
+
+def get_template_hash(name: str = MODULE_TEMPLATE) -> str:
+    env = get_jinja2_env()
+    source, _, _ = env.loader.get_source(env, name)
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def get_fingerprint(module: TerraformModule, template_hash: str) -> str:
+    """
+    Hash of everything a rendered module depends on: its class, its attributes,
+    its `source` and the template it is rendered with.
+    """
+    cls = module.__class__
+    payload = {
+        "class": f"{cls.__module__}.{cls.__qualname__}",
+        "attributes": module.model_dump(mode="json"),
+        "source": getattr(module, "source", None),
+        "template": template_hash,
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _render_output(modules: List[TerraformModule], separator: str) -> str:
+    # Runs in the worker processes, module level so it can be pickled
+    return separator.join(render_modules(modules))
+
+
+class BuildResult(NamedTuple):
+    """
+    `written` maps every output file to whether it was written, `removed` lists the
+    outputs of the previous build that no longer have definitions and were deleted.
+    """
+
+    written: Dict[Path, bool]
+    removed: List[Path]
+
+
+class BuildState:
+    """
+    Persisted fingerprints of every output file of the previous build, keyed by the
+    resolved output path so the state doesn't depend on the working directory.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.outputs: Dict[str, List[str]] = {}
+        self.load()
+
+    def load(self):
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable build state at {self.path}: {e}")
+            return
+
+        if data.get("version") == BUILD_STATE_VERSION:
+            self.outputs = data.get("outputs", {})
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump({"version": BUILD_STATE_VERSION, "outputs": self.outputs}, file)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+class IncrementalBuild:
+    """
+    Renders definitions into output files, skipping every output whose inputs have
+    the same fingerprints as in the previous build.
+
+    Changed outputs are rendered in parallel on a process pool when `workers` is
+    set. Definition classes loaded from plugins must be importable in the workers,
+    which holds for the default fork start method on Linux.
+    """
+
+    def __init__(
+        self,
+        state_path: Union[str, Path],
+        target: Optional[Callable[[TerraformModule], Union[str, Path]]] = None,
+        directory: Optional[Union[str, Path]] = None,
+        separator: str = MODULE_SEPARATOR,
+        workers: Optional[int] = None,
+    ):
+        """
+        Parameters:
+            state_path (Path): File the fingerprints are persisted in.
+            target (Callable): Picks the output file of a module, `main.tf` by default.
+            directory (Path): Directory the output files are relative to.
+            separator (str): Text placed between modules in the same file.
+            workers (int): Size of the process pool, renders in-process when unset.
+        """
+        self.state = BuildState(state_path)
+        self.target = target or (lambda module: DEFAULT_TARGET)
+        self.directory = Path(directory) if directory else None
+        self.separator = separator
+        self.workers = workers
+
+    def _root(self) -> Path:
+        return (self.directory or Path.cwd()).resolve()
+
+    def _output_path(self, module: TerraformModule) -> Path:
+        path = Path(self.target(module))
+        return self.directory / path if self.directory else path
+
+    def _group(self, modules: Iterable[TerraformModule]):
+        template_hash = get_template_hash()
+        grouped: Dict[Path, List[TerraformModule]] = {}
+        fingerprints: Dict[Path, List[str]] = {}
+        for module in modules:
+            path = self._output_path(module)
+            grouped.setdefault(path, []).append(module)
+            fingerprints.setdefault(path, []).append(get_fingerprint(module, template_hash))
+        return grouped, fingerprints
+
+    def _stale(self, grouped, fingerprints) -> Dict[Path, List[TerraformModule]]:
+        return {
+            path: grouped[path]
+            for path, prints in fingerprints.items()
+            if self.state.outputs.get(str(path.resolve())) != prints or not path.exists()
+        }
+
+    def plan(self, modules: Iterable[TerraformModule]) -> Dict[Path, List[TerraformModule]]:
+        """
+        Groups modules per output file and returns only the outputs that need rendering.
+        """
+        return self._stale(*self._group(modules))
+
+    def build(self, modules: Iterable[TerraformModule]) -> BuildResult:
+        """
+        Renders and writes the outputs whose inputs changed since the last build, and
+        deletes the outputs of the last build that no longer have any definitions.
+        Only outputs inside `directory`, or the working directory, are ever deleted.
+
+        Returns:
+            BuildResult: The written and the removed output files.
+        """
+        grouped, fingerprints = self._group(modules)
+        stale = self._stale(grouped, fingerprints)
+        results = {path: False for path in grouped}
+        logger.info(f"{len(stale)} of {len(grouped)} outputs changed")
+
+        writer = BatchFileWriter()
+        if self.workers and len(stale) > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                futures = {
+                    path: pool.submit(_render_output, group, self.separator)
+                    for path, group in stale.items()
+                }
+                for path, future in futures.items():
+                    writer.add(path, future.result())
+        else:
+            for path, group in stale.items():
+                writer.add(path, _render_output(group, self.separator))
+
+        results.update(writer.flush())
+
+        outputs = {str(path.resolve()): prints for path, prints in fingerprints.items()}
+        root = self._root()
+        removed = []
+        for orphan in map(Path, set(self.state.outputs) - set(outputs)):
+            if not orphan.is_relative_to(root):
+                # Written by a build into another directory, not ours to delete
+                logger.warning(f"Not removing orphaned output {orphan} outside {root}")
+                continue
+            try:
+                orphan.unlink(missing_ok=True)
+            except OSError as e:
+                # Stays in the state, the next build tries again
+                logger.warning(f"Could not remove orphaned output {orphan}: {e}")
+                outputs[str(orphan)] = self.state.outputs[str(orphan)]
+                continue
+            removed.append(orphan)
+        if removed:
+            logger.info(f"Removed {len(removed)} orphaned outputs")
+
+        self.state.outputs = outputs
+        self.state.save()
+        return BuildResult(results, sorted(removed))
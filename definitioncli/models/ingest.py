@@ -0,0 +1,230 @@
+import json
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import IO, Any, Iterator, List, NamedTuple, Tuple, Type, Union
+
+from pydantic import TypeAdapter, ValidationError
+
+from definitioncli.models.terraform import TerraformModule
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+READ_SIZE = 64 * 1024
+# A JSON array item still undecodable after this much input is treated as malformed
+MAX_RECORD_SIZE = 16 * 1024 * 1024
+
+JSONL_SUFFIXES = {".jsonl", ".ndjson"}
+JSON_SUFFIXES = {".json"}
+YAML_SUFFIXES = {".yaml", ".yml"}
+
+
+class RecordError(NamedTuple):
+    """
+    A record that failed to parse or validate, `line` is where the record starts.
+    """
+
+    path: str
+    line: int
+    errors: List[dict]
+
+
+@lru_cache(maxsize=None)
+def get_batch_adapter(cls: Type[TerraformModule]) -> TypeAdapter:
+    """
+    Cached adapter validating a whole list of records of `cls` in one call.
+    """
+    return TypeAdapter(List[cls])
+
+
+# The record iterators below yield a parse error in place of a record that can't be
+# decoded, the loader turns it into a RecordError instead of failing the whole file.
+
+
+def iter_jsonl(file: IO[str]) -> Iterator[Tuple[int, Any]]:
+    for line_number, line in enumerate(file, start=1):
+        if line.strip():
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, e
+
+
+def iter_json_array(file: IO[str]) -> Iterator[Tuple[int, Any]]:
+    """
+    Incrementally decodes the items of a top level JSON array, so the whole document
+    never has to be in memory.
+
+    The array can't be resynchronised after a malformed item, so that item's error
+    is the last thing yielded.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    line = 1
+    started = False
+    eof = False
+
+    while True:
+        # Skip whitespace and separators, keeping track of the line number
+        index = 0
+        while index < len(buffer) and buffer[index] in " \t\r\n,[]":
+            if buffer[index] == "\n":
+                line += 1
+            elif buffer[index] == "[":
+                if started:
+                    raise ValueError(f"Nested array at line {line}, expected a list of records")
+                started = True
+            elif buffer[index] == "]":
+                return
+            index += 1
+        buffer = buffer[index:]
+
+        if not buffer:
+            if eof:
+                return
+            chunk = file.read(READ_SIZE)
+            eof = not chunk
+            buffer += chunk
+            continue
+
+        if not started:
+            raise ValueError("Expected a JSON array of records")
+
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError as e:
+            # More input can't fix an error followed by further lines, don't read the
+            # rest of the file looking for the end of the item
+            if eof or "\n" in buffer[e.pos :] or len(buffer) > MAX_RECORD_SIZE:
+                yield line, e
+                return
+            # The item continues in the next chunk
+            chunk = file.read(READ_SIZE)
+            eof = not chunk
+            buffer += chunk
+            continue
+
+        yield line, item
+        line += buffer.count("\n", 0, end)
+        buffer = buffer[end:]
+
+
+def iter_yaml(file: IO[str]) -> Iterator[Tuple[int, Any]]:
+    """
+    Yields the items of a YAML list, or every document of a multi document stream.
+    Items are constructed one at a time from the node tree.
+    """
+    try:
+        import yaml
+    except ImportError as e:
+        raise ImportError("Loading YAML inventories requires PyYAML.") from e
+
+    loader = yaml.SafeLoader(file)
+    try:
+        while loader.check_node():
+            node = loader.get_node()
+            if isinstance(node, yaml.SequenceNode):
+                for item in node.value:
+                    yield item.start_mark.line + 1, loader.construct_document(item)
+            else:
+                yield node.start_mark.line + 1, loader.construct_document(node)
+    except yaml.MarkedYAMLError as e:
+        # The parser can't continue past a syntax error
+        yield (e.problem_mark.line + 1 if e.problem_mark else 0), e
+    finally:
+        loader.dispose()
+
+
+def iter_records(file: IO[str], suffix: str) -> Iterator[Tuple[int, Any]]:
+    if suffix in JSONL_SUFFIXES:
+        return iter_jsonl(file)
+    if suffix in JSON_SUFFIXES:
+        return iter_json_array(file)
+    if suffix in YAML_SUFFIXES:
+        return iter_yaml(file)
+    raise ValueError(f"Unsupported inventory format '{suffix}'")
+
+
+def get_parse_errors(error: Exception) -> List[dict]:
+    """
+    Describes a parse error like pydantic describes validation errors.
+    """
+    if isinstance(error, json.JSONDecodeError):
+        return [{"type": "json_invalid", "loc": (), "msg": f"Invalid JSON: {error.msg}"}]
+    return [{"type": "syntax_error", "loc": (), "msg": str(error)}]
+
+
+class DefinitionLoader:
+    """
+    Streams records of a definition class from JSON, JSONL or YAML inventories.
+
+    Records are validated in batches through a cached `TypeAdapter` and valid models
+    are yielded lazily. Invalid records don't stop the stream, they are collected in
+    `errors` together with the line they start on. Records that can't be parsed are
+    collected the same way.
+    """
+
+    def __init__(self, cls: Type[TerraformModule], batch_size: int = DEFAULT_BATCH_SIZE):
+        self.cls = cls
+        self.batch_size = batch_size
+        self.errors: List[RecordError] = []
+
+    def _validate(self, path: str, batch: List[Tuple[int, Any]]) -> List[TerraformModule]:
+        adapter = get_batch_adapter(self.cls)
+        records = [record for _, record in batch]
+        try:
+            return adapter.validate_python(records)
+        except ValidationError as e:
+            failed = {}
+            for error in e.errors():
+                failed.setdefault(error["loc"][0], []).append(error)
+
+        for index, errors in failed.items():
+            self.errors.append(RecordError(path, batch[index][0], errors))
+
+        # The remaining records are known to be valid
+        return adapter.validate_python(
+            [record for index, record in enumerate(records) if index not in failed]
+        )
+
+    def load(self, path: Union[str, Path]) -> Iterator[TerraformModule]:
+        """
+        Lazily yields the valid models of an inventory file.
+
+        Parameters:
+            path (Path): Inventory file, the format is picked from the suffix.
+
+        Yields:
+            TerraformModule: Validated models in file order.
+        """
+        path = Path(path)
+        batch: List[Tuple[int, Any]] = []
+        with open(path, "r", encoding="utf-8") as file:
+            for line, record in iter_records(file, path.suffix.lower()):
+                if isinstance(record, Exception):
+                    self.errors.append(RecordError(str(path), line, get_parse_errors(record)))
+                    continue
+                batch.append((line, record))
+                if len(batch) >= self.batch_size:
+                    yield from self._validate(str(path), batch)
+                    batch = []
+
+        if batch:
+            yield from self._validate(str(path), batch)
+
+        if self.errors:
+            logger.warning(f"{len(self.errors)} invalid records in {path}")
+
+
+def load_definitions(
+    path: Union[str, Path],
+    cls: Type[TerraformModule],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Tuple[Iterator[TerraformModule], List[RecordError]]:
+    """
+    Convenience wrapper around `DefinitionLoader`, the error list fills up while the
+    returned iterator is consumed.
+    """
+    loader = DefinitionLoader(cls, batch_size=batch_size)
+    return loader.load(path), loader.errors
@@ -0,0 +1,215 @@
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Type, Union
+
+from pydantic import TypeAdapter, ValidationError
+
+from definitioncli.models.terraform import TerraformModule
+
+
+def _compact(value: Any) -> Any:
+    """
+    Share equal values between rows, strings are interned and lists become tuples.
+    """
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, list):
+        return tuple(_compact(item) for item in value)
+    return value
+
+
+class _EncodedColumn:
+    """
+    Dictionary-encoded column: every row stores a small integer code into `values`,
+    with a posting list of row ids per code as secondary index.
+    """
+
+    __slots__ = ("values", "codes", "lookup", "postings")
+
+    def __init__(self, known_values: Iterable[Any] = ()):
+        self.values: List[Any] = []
+        self.lookup: Dict[Any, int] = {}
+        self.codes = array("I")
+        self.postings: List[array] = []
+        for value in known_values:
+            self.encode(value)
+
+    def encode(self, value: Any) -> int:
+        code = self.lookup.get(value)
+        if code is None:
+            code = self.lookup[value] = len(self.values)
+            self.values.append(value)
+            self.postings.append(array("I"))
+        return code
+
+    def append(self, row: int, value: Any):
+        code = self.encode(_compact(value))
+        self.codes.append(code)
+        self.postings[code].append(row)
+
+    def __getitem__(self, row: int) -> Any:
+        return self.values[self.codes[row]]
+
+    def rows(self, value: Any) -> array:
+        code = self.lookup.get(_compact(value))
+        return self.postings[code] if code is not None else array("I")
+
+
+class InventoryStore:
+    """
+    Compact columnar store of definition instances of a single class.
+
+    The fields a definition enumerates in `__opts__` are dictionary-encoded and
+    indexed, so filtering, grouping and counting on them never touches the other
+    columns. Other fields are kept as plain columns with shared values. Models are
+    only materialised on request.
+    """
+
+    def __init__(self, cls: Type[TerraformModule]):
+        self.cls = cls
+        self.fields = list(cls.model_fields)
+
+        opts_getter = getattr(cls, "__opts__", None)
+        opts: Dict[str, List] = opts_getter() if opts_getter else {}
+
+        self._encoded: Dict[str, _EncodedColumn] = {
+            field: _EncodedColumn(_compact(value) for value in values)
+            for field, values in opts.items()
+            if field in cls.model_fields
+        }
+        self._columns: Dict[str, List[Any]] = {
+            field: [] for field in self.fields if field not in self._encoded
+        }
+        self._size = 0
+
+    @property
+    def indexed_fields(self) -> List[str]:
+        return list(self._encoded)
+
+    def append(self, record: Union[TerraformModule, Dict[str, Any]]):
+        """
+        Add a validated model (or an already validated dict of its fields).
+        """
+        if isinstance(record, TerraformModule):
+            record = record.model_dump()
+
+        row = self._size
+        for field, column in self._encoded.items():
+            column.append(row, record.get(field))
+        for field, column in self._columns.items():
+            column.append(_compact(record.get(field)))
+        self._size += 1
+
+    def extend(self, records: Iterable[Union[TerraformModule, Dict[str, Any]]]):
+        for record in records:
+            self.append(record)
+
+    def __len__(self):
+        return self._size
+
+    def get(self, row: int, field: str) -> Any:
+        if column := self._encoded.get(field):
+            return column[row]
+        return self._columns[field][row]
+
+    def row(self, row: int) -> Dict[str, Any]:
+        return {field: self.get(row, field) for field in self.fields}
+
+    def model(self, row: int) -> TerraformModule:
+        """
+        Rebuild the model of a row, the data was validated on the way in.
+        """
+        values = {
+            field: list(value) if isinstance(value, tuple) else value
+            for field, value in self.row(row).items()
+        }
+        return self.cls.model_construct(**values)
+
+    def parse_criteria(self, criteria: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Convert textual criteria (e.g. from the command line) to the field types.
+        """
+        parsed = {}
+        for field, value in criteria.items():
+            if field not in self.fields:
+                raise KeyError(f"Unknown field '{field}' for {self.cls.__name__}")
+            annotation = self.cls.model_fields[field].annotation
+            try:
+                parsed[field] = TypeAdapter(annotation).validate_python(value)
+            except ValidationError as e:
+                raise ValueError(
+                    f"Invalid value '{value}' for field '{field}': {e.errors()[0]['msg']}"
+                ) from None
+        return parsed
+
+    def filter(self, **criteria) -> List[int]:
+        """
+        Row ids matching every `field=value` criterion. Indexed fields are resolved
+        through their posting lists, smallest first, the rest by scanning the matches.
+        """
+        for field in criteria:
+            if field not in self.fields:
+                raise KeyError(f"Unknown field '{field}' for {self.cls.__name__}")
+
+        indexed = sorted(
+            (
+                self._encoded[field].rows(value)
+                for field, value in criteria.items()
+                if field in self._encoded
+            ),
+            key=len,
+        )
+        scanned = {
+            field: _compact(value)
+            for field, value in criteria.items()
+            if field not in self._encoded
+        }
+
+        if indexed:
+            rows: Iterable[int] = indexed[0]
+            for other in indexed[1:]:
+                members = set(other)
+                rows = [row for row in rows if row in members]
+        else:
+            rows = range(self._size)
+
+        return [
+            row
+            for row in rows
+            if all(self._columns[field][row] == value for field, value in scanned.items())
+        ]
+
+    def count(self, **criteria) -> int:
+        if not criteria:
+            return self._size
+        if len(criteria) == 1:
+            (field, value), = criteria.items()
+            if field in self._encoded:
+                return len(self._encoded[field].rows(value))
+        return len(self.filter(**criteria))
+
+    def group_by(self, field: str, **criteria) -> Dict[Any, int]:
+        """
+        Number of rows per value of `field`, optionally within a filter.
+        """
+        if field not in self.fields:
+            raise KeyError(f"Unknown field '{field}' for {self.cls.__name__}")
+
+        column = self._encoded.get(field)
+        if column is not None and not criteria:
+            return {
+                value: len(column.postings[code])
+                for code, value in enumerate(column.values)
+                if column.postings[code]
+            }
+
+        counts: Dict[Any, int] = {}
+        rows = self.filter(**criteria) if criteria else range(self._size)
+        for row in rows:
+            value = self.get(row, field)
+            counts[value] = counts.get(value, 0) + 1
+        return counts
+
+    def models(self, rows: Optional[Iterable[int]] = None) -> Iterator[TerraformModule]:
+        for row in range(self._size) if rows is None else rows:
+            yield self.model(row)
@@ -1,21 +1,132 @@
 from pydantic import BaseModel, Field
-from abc import abstractmethod
-from definitioncli.utils import to_snake_case
-from definitioncli.templates import get_jinja2_env
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional, TextIO, Union
+from definitioncli.profiling import span
+from definitioncli.utils import BatchFileWriter, to_snake_case
+from definitioncli.templates import get_template
+
+MODULE_TEMPLATE = "module.tf.j2"
+MODULE_SEPARATOR = "\n\n"
+
+
+@lru_cache(maxsize=None)
+def get_module_name(cls: type) -> str:
+    return to_snake_case(cls.__name__)
 
 
 class TerraformModule(BaseModel):
 
-    @abstractmethod
     def render(self) -> str:
         """
         Render the Terraform module as a string.
+
+        Not abstract: definitions instantiate TerraformModule subclasses that only
+        declare fields, they all render through the shared module template.
         """
 
-        j2_env = get_jinja2_env()
-        template = j2_env.get_template("module.tf.j2")
-        kwargs = {
-            "module_name": to_snake_case(self.__class__.__name__),
-            "module_attr": self.model_dump(),
-        }
-        return template.render(**kwargs)
+        module_name = get_module_name(self.__class__)
+        with span(module_name, "render", template=MODULE_TEMPLATE):
+            template = get_template(MODULE_TEMPLATE)
+            kwargs = {
+                "module_name": module_name,
+                "module_attributes": self.model_dump(),
+            }
+            return template.render(**kwargs)
+
+
+def render_modules(modules: Iterable[TerraformModule]) -> Iterator[str]:
+    """
+    Lazily render many modules, the template is compiled only once for all of them.
+    """
+    for module in modules:
+        yield module.render()
+
+
+def write_modules(
+    modules: Iterable[TerraformModule],
+    output: Union[str, Path, TextIO],
+    separator: str = MODULE_SEPARATOR,
+) -> int:
+    """
+    Stream rendered modules into a single file (or open text stream) as they are
+    rendered, without collecting them in memory first.
+
+    Returns:
+        The number of modules written.
+    """
+    if not isinstance(output, (str, Path)):
+        return _write_stream(modules, output, separator)
+
+    with open(output, "w", encoding="utf-8") as file:
+        return _write_stream(modules, file, separator)
+
+
+def _write_stream(modules: Iterable[TerraformModule], file: TextIO, separator: str) -> int:
+    count = 0
+    for rendered in render_modules(modules):
+        if count:
+            file.write(separator)
+        file.write(rendered)
+        count += 1
+    return count
+
+
+def write_modules_by_target(
+    modules: Iterable[TerraformModule],
+    target: Callable[[TerraformModule], Union[str, Path]],
+    separator: str = MODULE_SEPARATOR,
+    directory: Optional[Union[str, Path]] = None,
+) -> Dict[Path, int]:
+    """
+    Stream rendered modules into several files, `target` picks the file of every module.
+    Each file is opened once and kept open until all modules are written.
+
+    Returns:
+        The number of modules written per file.
+    """
+    files: Dict[Path, TextIO] = {}
+    counts: Dict[Path, int] = {}
+    try:
+        for module in modules:
+            path = Path(target(module))
+            if directory is not None:
+                path = Path(directory) / path
+
+            file = files.get(path)
+            if file is None:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                file = files[path] = open(path, "w", encoding="utf-8")
+                counts[path] = 0
+            elif counts[path]:
+                file.write(separator)
+
+            file.write(module.render())
+            counts[path] += 1
+    finally:
+        for file in files.values():
+            file.close()
+
+    return counts
+
+
+def write_modules_batched(
+    modules: Iterable[TerraformModule],
+    target: Callable[[TerraformModule], Union[str, Path]],
+    separator: str = MODULE_SEPARATOR,
+    directory: Optional[Union[str, Path]] = None,
+) -> Dict[Path, bool]:
+    """
+    Render modules into their target files through a `BatchFileWriter`, only files
+    whose content changed are rewritten and every write is atomic.
+
+    Returns:
+        Mapping of file path to whether it was written.
+    """
+    writer = BatchFileWriter(separator=separator)
+    for module in modules:
+        path = Path(target(module))
+        if directory is not None:
+            path = Path(directory) / path
+        writer.add(path, module.render())
+    return writer.flush()
@@ -0,0 +1,156 @@
+import json
+import os
+import threading
+import time
+from importlib.abc import Loader
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+_profiler: Optional["Profiler"] = None
+
+
+class Profiler:
+    """
+    Collects timed spans and exports them in the Chrome trace event format, which
+    chrome://tracing, Perfetto and speedscope can open.
+    """
+
+    def __init__(self):
+        self.events: List[dict] = []
+        self.pid = os.getpid()
+        self._origin = time.perf_counter_ns()
+
+    def record(self, name: str, category: str, start_ns: int, end_ns: int, args: dict):
+        # list.append is atomic, spans from several threads need no lock
+        self.events.append(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start_ns - self._origin) / 1000,
+                "dur": (end_ns - start_ns) / 1000,
+                "pid": self.pid,
+                "tid": threading.get_ident(),
+                "args": args,
+            }
+        )
+
+    def to_trace(self) -> dict:
+        return {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+
+    def export(self, path: Union[str, Path]):
+        Path(path).write_text(json.dumps(self.to_trace()), encoding="utf-8")
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Count and total duration in milliseconds per category.
+        """
+        totals: Dict[str, Dict[str, float]] = {}
+        for event in self.events:
+            total = totals.setdefault(event["cat"], {"count": 0, "total_ms": 0.0})
+            total["count"] += 1
+            total["total_ms"] += event["dur"] / 1000
+        return totals
+
+
+class Span:
+    """
+    Times the enclosed block, extra details can be attached with `set`.
+    """
+
+    __slots__ = ("_profiler", "name", "category", "args", "_start")
+
+    def __init__(self, profiler: Profiler, name: str, category: str, args: dict):
+        self._profiler = profiler
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def set(self, **args):
+        self.args.update(args)
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self._profiler.record(
+            self.name, self.category, self._start, time.perf_counter_ns(), self.args
+        )
+
+
+class _NoopSpan:
+    """
+    Returned while profiling is disabled, so instrumented code pays one None check.
+    """
+
+    __slots__ = ()
+
+    def set(self, **args):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, category: str, **args) -> Union[Span, _NoopSpan]:
+    profiler = _profiler
+    if profiler is None:
+        return _NOOP_SPAN
+    return Span(profiler, name, category, args)
+
+
+def is_profiling() -> bool:
+    return _profiler is not None
+
+
+def enable_profiling() -> Profiler:
+    """
+    Starts collecting spans. Enable it before plugins are loaded, module execution
+    is only instrumented for modules registered while profiling is on.
+    """
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler()
+    return _profiler
+
+
+def disable_profiling() -> Optional[Profiler]:
+    """
+    Stops collecting spans and returns the profiler holding what was collected.
+    """
+    global _profiler
+    profiler, _profiler = _profiler, None
+    return profiler
+
+
+def get_profiler() -> Optional[Profiler]:
+    return _profiler
+
+
+class ProfiledLoader(Loader):
+    """
+    Wraps a module loader so executing the module is recorded as a span.
+    """
+
+    def __init__(self, loader: Loader, name: str):
+        self.loader = loader
+        self.name = name
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        with span(self.name, "exec_module", file=getattr(self.loader, "path", None)):
+            self.loader.exec_module(module)
+
+    def __getattr__(self, attr):
+        return getattr(self.loader, attr)
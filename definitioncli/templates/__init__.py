@@ -1,6 +1,54 @@
-from jinja2 import Environment, PackageLoader
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
 
+from jinja2 import Environment, FileSystemBytecodeCache, PackageLoader, Template
 
-def get_jinja2_env():
-    env = Environment(loader=PackageLoader("definitioncli", "templates"))
-    return env
+_env: Optional[Environment] = None
+_env_lock = threading.Lock()
+_bytecode_cache_dir: Optional[str] = None
+
+
+def configure_jinja2_env(bytecode_cache_dir: Optional[str] = None):
+    """
+    Configures the process-wide environment, the next `get_jinja2_env` builds it anew.
+
+    With `bytecode_cache_dir` compiled templates are stored on disk, so a fresh
+    process doesn't have to compile them again.
+    """
+    global _env, _bytecode_cache_dir
+    with _env_lock:
+        _bytecode_cache_dir = bytecode_cache_dir
+        _env = None
+    get_template.cache_clear()
+
+
+def get_jinja2_env() -> Environment:
+    """
+    Returns the process-wide environment, templates are only parsed and compiled once.
+    """
+    global _env
+    if _env is None:
+        with _env_lock:
+            if _env is None:
+                bytecode_cache = None
+                if _bytecode_cache_dir:
+                    Path(_bytecode_cache_dir).mkdir(parents=True, exist_ok=True)
+                    bytecode_cache = FileSystemBytecodeCache(_bytecode_cache_dir)
+                _env = Environment(
+                    loader=PackageLoader("definitioncli", "templates"),
+                    bytecode_cache=bytecode_cache,
+                    # Templates ship with the package, no need to check them for changes
+                    auto_reload=False,
+                    cache_size=-1,
+                )
+    return _env
+
+
+@lru_cache(maxsize=None)
+def get_template(name: str) -> Template:
+    """
+    Compiled template from the process-wide environment.
+    """
+    return get_jinja2_env().get_template(name)
@@ -1,3 +1,10 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+
 def to_snake_case(text: str) -> str:
     """
     Convert a string to snake_case.
@@ -33,3 +40,107 @@ def create_new_file(
     """
     with open(file_path, mode, encoding=encoding) as file:
         file.write(content)
+
+
+def hash_file(file_path: Union[str, Path], chunk_size: int = 1024 * 1024) -> Optional[str]:
+    """
+    sha256 of a file's content, None if the file doesn't exist.
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(file_path, "rb") as file:
+            while chunk := file.read(chunk_size):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def write_file_atomic(
+    file_path: Union[str, Path],
+    chunks: Iterable[str],
+    encoding: str = "utf-8",
+) -> None:
+    """
+    Write content to a temporary file next to `file_path` and rename it into place,
+    so readers only ever see the old or the complete new file.
+    """
+    path = Path(file_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        # mkstemp creates the file as 0600, keep the mode of the file being replaced
+        try:
+            mode = path.stat().st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(tmp_path, mode)
+
+        with os.fdopen(fd, "w", encoding=encoding) as file:
+            for chunk in chunks:
+                file.write(chunk)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+class BatchFileWriter:
+    """
+    Collects content per target file and writes every file once on `flush`.
+
+    Files whose content hash matches what is already on disk are left alone, so
+    their mtime doesn't change. Changed files are replaced atomically.
+    """
+
+    def __init__(self, separator: str = "", encoding: str = "utf-8"):
+        self.separator = separator
+        self.encoding = encoding
+        self._files: Dict[Path, List[str]] = {}
+
+    def add(self, file_path: Union[str, Path], content: str) -> None:
+        """
+        Queue content for a file, content for the same file is joined with `separator`.
+        """
+        self._files.setdefault(Path(file_path), []).append(content)
+
+    def _chunks(self, parts: List[str]) -> Iterator[str]:
+        for i, part in enumerate(parts):
+            if i and self.separator:
+                yield self.separator
+            yield part
+
+    def flush(self) -> Dict[Path, bool]:
+        """
+        Write every queued file that differs from its content on disk.
+
+        Returns:
+            Mapping of file path to whether it was written.
+        """
+        written = {}
+        for path, parts in self._files.items():
+            digest = hashlib.sha256()
+            for chunk in self._chunks(parts):
+                digest.update(chunk.encode(self.encoding))
+
+            if digest.hexdigest() == hash_file(path):
+                written[path] = False
+                continue
+
+            write_file_atomic(path, self._chunks(parts), encoding=self.encoding)
+            written[path] = True
+
+        self._files.clear()
+        return written
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Nothing is written when the batch failed half way
+        if exc_type is None:
+            self.flush()
+        else:
+            self._files.clear()
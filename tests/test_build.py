@@ -0,0 +1,48 @@
+from pathlib import Path
+
+from definitioncli.models.build import IncrementalBuild
+from definitioncli.models.terraform import TerraformModule
+
+
+class FirewallRule(TerraformModule):
+    name: str
+    port: int
+
+
+def by_name(rule: FirewallRule) -> str:
+    return f"{rule.name}.tf"
+
+
+def test_orphaned_outputs_are_removed_from_the_directory(tmp_path, monkeypatch):
+    out = tmp_path / "out"
+    state = tmp_path / "state.json"
+    rules = [FirewallRule(name=name, port=22) for name in ("ssh", "web")]
+
+    monkeypatch.chdir(tmp_path)
+    first = IncrementalBuild(state, target=by_name, directory="out").build(rules)
+    assert first.written == {Path("out/ssh.tf"): True, Path("out/web.tf"): True}
+
+    # A file of the same name next to the working directory must survive
+    cwd = tmp_path / "cwd"
+    (cwd / "out").mkdir(parents=True)
+    (cwd / "out" / "web.tf").write_text("unrelated\n")
+    monkeypatch.chdir(cwd)
+
+    second = IncrementalBuild(state, target=by_name, directory="../out").build(rules[:1])
+
+    assert second.written == {Path("../out/ssh.tf"): False}
+    assert second.removed == [(out / "web.tf").resolve()]
+    assert not (out / "web.tf").exists()
+    assert (out / "ssh.tf").exists()
+    assert (cwd / "out" / "web.tf").read_text() == "unrelated\n"
+
+
+def test_orphans_outside_the_directory_are_kept(tmp_path):
+    state = tmp_path / "state.json"
+    rule = FirewallRule(name="ssh", port=22)
+
+    IncrementalBuild(state, target=by_name, directory=tmp_path / "a").build([rule])
+    result = IncrementalBuild(state, target=by_name, directory=tmp_path / "b").build([])
+
+    assert result.removed == []
+    assert (tmp_path / "a" / "ssh.tf").exists()
@@ -0,0 +1,25 @@
+import pytest
+
+from definitioncli.cli.list import list_plugins
+from definitioncli.definitions.manager import teardown_plugin_manager
+
+
+@pytest.fixture
+def plugin(tmp_path):
+    plugin = tmp_path / "lp"
+    for sub in ("automations", "modules"):
+        (plugin / sub).mkdir(parents=True)
+        (plugin / sub / "__init__.py").write_text("")
+    (plugin / "__init__.py").write_text("")
+    (plugin / "automations" / "job.py").write_text("def main():\n    return 1\n")
+    yield plugin
+    teardown_plugin_manager()
+
+
+def test_list_fails_when_a_plugin_did_not_load(plugin, tmp_path, capsys):
+    assert list_plugins([str(plugin), str(tmp_path / "missing")]) == 1
+    assert "lp.automations.job" in capsys.readouterr().out
+
+
+def test_list_succeeds_when_every_plugin_loaded(plugin):
+    assert list_plugins([f"{plugin}/"]) == 0
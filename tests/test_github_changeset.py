@@ -0,0 +1,122 @@
+import pytest
+
+from benchmarks.synthetic import GitRepository, StubServer
+from definitioncli.external.github.changeset import GitHubChangeSet
+
+
+@pytest.fixture
+def repository():
+    return GitRepository("octo", "infra", "main")
+
+
+@pytest.fixture
+def server(repository):
+    with StubServer(repository) as server:
+        yield server
+
+
+def changeset(server, **kwargs) -> GitHubChangeSet:
+    return GitHubChangeSet("token", "octo", "infra", "main", "update", url=server.url, **kwargs)
+
+
+def test_push_creates_the_head_ref(repository, server):
+    base = repository.refs["refs/heads/main"]
+    changes = changeset(server)
+    changes.add("modules/net.tf", "resource {}\n")
+
+    result = changes.push("Add network")
+
+    assert result.created_ref
+    assert result.ref == "refs/heads/update"
+    assert repository.refs["refs/heads/update"] == result.commit
+    assert repository.refs["refs/heads/main"] == base
+    assert repository.commits[result.commit]["parents"] == [base]
+    assert repository.get_file("update", "modules/net.tf") == b"resource {}\n"
+    assert repository.get_file("update", "README.md") == b"# stub\n"
+    assert "PATCH git/refs" not in repository.requests
+
+
+def test_push_fast_forwards_an_existing_head(repository, server):
+    first = changeset(server)
+    first.add("modules/net.tf", "resource {}\n")
+    created = first.push("Add network")
+
+    second = changeset(server)
+    second.add("modules/net.tf", "resource { count = 2 }\n")
+    result = second.push("Scale network")
+
+    assert not result.created_ref
+    assert repository.commits[result.commit]["parents"] == [created.commit]
+    assert repository.refs["refs/heads/update"] == result.commit
+    assert repository.requests["PATCH git/refs"] == 1
+
+
+def test_unchanged_files_are_dropped(repository, server):
+    changes = changeset(server)
+    changes.add("README.md", "# stub\n")
+    changes.add("modules/net.tf", "resource {}\n")
+
+    result = changes.push("Add network")
+
+    assert (result.changed, result.unchanged) == (1, 1)
+
+    # Nothing left to commit, not even a ref is touched
+    again = changeset(server)
+    again.add("README.md", "# stub\n")
+    again.add("modules/net.tf", "resource {}\n")
+    head = repository.refs["refs/heads/update"]
+
+    result = again.push("Add network")
+
+    assert result.commit is None
+    assert result.unchanged == 2
+    assert repository.requests["POST git/trees"] == 1
+    assert repository.refs["refs/heads/update"] == head
+
+
+def test_large_and_binary_files_are_uploaded_as_blobs(repository, server):
+    changes = changeset(server, inline_limit=16)
+    changes.add("small.txt", "inline\n")
+    changes.add("large.txt", "x" * 64)
+    changes.add("image.png", b"\x89PNG\r\n\x1a\n\xff")
+
+    result = changes.push("Add files")
+
+    assert (result.changed, result.blobs) == (3, 2)
+    assert repository.requests["POST git/blobs"] == 2
+    assert repository.get_file("update", "small.txt") == b"inline\n"
+    assert repository.get_file("update", "large.txt") == b"x" * 64
+    assert repository.get_file("update", "image.png") == b"\x89PNG\r\n\x1a\n\xff"
+
+
+def test_open_pull_request_is_reused(repository, server):
+    first = changeset(server)
+    first.add("modules/net.tf", "resource {}\n")
+    opened = first.push("Add network", title="Network").pull_request
+
+    second = changeset(server)
+    second.add("modules/net.tf", "resource { count = 2 }\n")
+    reused = second.push("Scale network", title="Network").pull_request
+
+    assert opened["number"] == reused["number"] == 1
+    assert opened["head"] == "update"
+    assert opened["base"] == "main"
+    assert len(repository.pulls) == 1
+
+
+def test_deletion_missing_from_a_truncated_tree_is_skipped(repository, server):
+    setup = changeset(server)
+    for i in range(4):
+        setup.add(f"modules/module_{i}.tf", f"# {i}\n")
+    setup.push("Add modules")
+    repository.tree_limit = 2
+
+    changes = changeset(server)
+    changes.delete("modules/module_3.tf")
+    changes.delete("modules/missing.tf")
+    result = changes.push("Remove modules")
+
+    assert result.changed == 1
+    assert repository.get_file("update", "modules/module_3.tf") is None
+    assert repository.get_file("update", "modules/module_2.tf") == b"# 2\n"
+    assert repository.requests["GET contents/modules"] == 2
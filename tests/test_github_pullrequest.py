@@ -0,0 +1,128 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from definitioncli.external.github.pullrequest import (
+    GitHubPullRequest,
+    create_pull_requests,
+)
+from definitioncli.external.github.request import AsyncGithubApi
+
+
+class PullsHandler(BaseHTTPRequestHandler):
+    """
+    Answers POST /repos/{owner}/{repo}/pulls like GitHub, anything else is a 404.
+    """
+
+    protocol_version = "HTTP/1.1"
+    wbufsize = -1
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, code: int, body: dict):
+        payload = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.server.received.append(
+            {
+                "path": self.path,
+                "content_type": self.headers.get("Content-Type"),
+                "authorization": self.headers.get("Authorization"),
+                "body": body,
+            }
+        )
+
+        parts = self.path.strip("/").split("/")
+        if len(parts) != 4 or parts[0] != "repos" or parts[3] != "pulls":
+            return self._reply(404, {"message": "Not Found"})
+
+        pull = json.loads(body)
+        with self.server.lock:
+            self.server.number += 1
+            number = self.server.number
+        self._reply(201, {"number": number, "title": pull["title"], "head": {"ref": pull["head"]}})
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PullsHandler)
+    server.received = []
+    server.number = 0
+    server.lock = threading.Lock()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_pull_request(head: str, repo: str = "definitions") -> GitHubPullRequest:
+    return GitHubPullRequest(
+        token="token",
+        owner="acme",
+        repo=repo,
+        title=f"Update {head}",
+        head=head,
+        base="main",
+        body="Generated",
+    )
+
+
+def test_create_pull_requests_posts_json_to_repos_endpoint(server):
+    api = AsyncGithubApi("token", max_concurrency=4, url=f"http://127.0.0.1:{server.server_port}")
+    pulls = [make_pull_request(f"branch-{n}") for n in range(5)]
+
+    try:
+        results = asyncio.run(create_pull_requests(api, pulls))
+    finally:
+        api.close()
+
+    assert [result["head"]["ref"] for result in results] == [f"branch-{n}" for n in range(5)]
+    assert sorted(result["number"] for result in results) == [1, 2, 3, 4, 5]
+
+    assert len(server.received) == 5
+    for request in server.received:
+        assert request["path"] == "/repos/acme/definitions/pulls"
+        assert request["content_type"] == "application/json"
+        assert request["authorization"] == "Bearer token"
+        pull = json.loads(request["body"])
+        assert pull["base"] == "main"
+        assert pull["draft"] is False
+
+
+def test_create_pull_requests_returns_failures_in_place(server):
+    api = AsyncGithubApi("token", url=f"http://127.0.0.1:{server.server_port}")
+    pulls = [make_pull_request("ok"), make_pull_request("broken", repo="a/b")]
+
+    try:
+        results = asyncio.run(create_pull_requests(api, pulls))
+    finally:
+        api.close()
+
+    assert results[0]["number"] == 1
+    assert isinstance(results[1], Exception)
+
+
+def test_client_is_reused_across_event_loops(server):
+    # Ten posts through two slots make requests wait on the semaphore in both runs
+    api = AsyncGithubApi("token", max_concurrency=2, url=f"http://127.0.0.1:{server.server_port}")
+
+    try:
+        for run in range(2):
+            pulls = [make_pull_request(f"run-{run}-{n}") for n in range(10)]
+            results = asyncio.run(create_pull_requests(api, pulls))
+            assert not [result for result in results if isinstance(result, Exception)]
+    finally:
+        api.close()
+
+    assert len(server.received) == 20
@@ -0,0 +1,81 @@
+import io
+import json
+
+import pytest
+
+from definitioncli.models import ingest
+from definitioncli.models.ingest import DefinitionLoader, iter_json_array
+from definitioncli.models.terraform import TerraformModule
+
+
+class FirewallRule(TerraformModule):
+    name: str
+    port: int
+
+
+RULES = [{"name": f"rule{n}", "port": n, "tags": ["a", "b"]} for n in range(5)]
+
+
+@pytest.fixture
+def small_reads(monkeypatch):
+    # Items and line breaks straddle every chunk boundary
+    monkeypatch.setattr(ingest, "READ_SIZE", 7)
+
+
+def start_lines(text: str, marker: str):
+    return [number for number, line in enumerate(text.splitlines(), start=1) if marker in line]
+
+
+def load(tmp_path, name: str, text: str):
+    path = tmp_path / name
+    path.write_text(text)
+    loader = DefinitionLoader(FirewallRule, batch_size=2)
+    rules = list(loader.load(path))
+    return [rule.name for rule in rules], [(error.line, error.errors) for error in loader.errors]
+
+
+def test_pretty_printed_array_in_small_chunks(small_reads):
+    text = json.dumps(RULES, indent=2)
+
+    records = list(iter_json_array(io.StringIO(text)))
+
+    assert [record for _, record in records] == RULES
+    assert [line for line, _ in records] == start_lines(text, "{")
+
+
+def test_malformed_item_mid_array_ends_the_stream(small_reads, tmp_path):
+    text = (
+        "[\n"
+        '  {"name": "first", "port": 1},\n'
+        '  {"name": "second", "port": "ssh"},\n'
+        "\n"
+        '  {"name": "broken", "port": },\n'
+        '  {"name": "after", "port": 4}\n'
+        "]\n"
+    )
+
+    names, errors = load(tmp_path, "rules.json", text)
+
+    assert names == ["first"]
+    (invalid_line, invalid), (broken_line, broken) = errors
+    assert invalid_line == 3
+    assert invalid[0]["loc"][-1] == "port"
+    assert broken_line == 5
+    assert broken[0]["type"] == "json_invalid"
+
+
+def test_bad_jsonl_line_is_skipped(tmp_path):
+    text = (
+        '{"name": "first", "port": 1}\n'
+        "\n"
+        '{"name": "broken", \n'
+        '{"name": "third", "port": "ssh"}\n'
+        '{"name": "fourth", "port": 4}\n'
+    )
+
+    names, errors = load(tmp_path, "rules.jsonl", text)
+
+    assert names == ["first", "fourth"]
+    assert [line for line, _ in errors] == [3, 4]
+    assert errors[0][1][0]["type"] == "json_invalid"
+    assert errors[1][1][0]["loc"][-1] == "port"
@@ -0,0 +1,82 @@
+from pathlib import Path
+
+import pytest
+
+from definitioncli.definitions.loader import Definition
+from definitioncli.definitions.manifest import ManifestCache
+
+MODULE = """\
+with open({log!r}, "a") as log:
+    log.write(__name__ + "\\n")
+
+__virtualname__ = "network"
+
+
+def ping(host, count=1):
+    return host
+"""
+
+AUTOMATION = """\
+with open({log!r}, "a") as log:
+    log.write(__name__ + "\\n")
+
+
+def main():
+    return "done"
+"""
+
+
+def make_plugin(root: Path, log: Path) -> Path:
+    plugin = root / "plug"
+    for sub in ("automations", "modules"):
+        (plugin / sub).mkdir(parents=True)
+        (plugin / sub / "__init__.py").write_text("")
+    (plugin / "__init__.py").write_text('__virtualname__ = "vp"\n')
+    (plugin / "modules" / "net.py").write_text(MODULE.format(log=str(log)))
+    (plugin / "automations" / "job.py").write_text(AUTOMATION.format(log=str(log)))
+    return plugin
+
+
+def executed(log: Path):
+    return log.read_text().split() if log.exists() else []
+
+
+@pytest.fixture
+def definitions():
+    created = []
+
+    def create(plugin: Path, manifest_path: Path):
+        definition = Definition(str(plugin), manifest=ManifestCache(manifest_path))
+        created.append(definition)
+        return definition
+
+    yield create
+    for definition in created:
+        definition.unload()
+
+
+def test_listing_executes_nothing(tmp_path, definitions):
+    log = tmp_path / "executed.log"
+    plugin = make_plugin(tmp_path, log)
+
+    definition = definitions(plugin, tmp_path / "manifest.json")
+
+    assert definition.virtualname == "vp"
+    assert list(definition.get_automations()) == ["vp.automations.job"]
+    assert "vp.modules.network" in list(definition.get_modules())
+    assert executed(log) == []
+
+
+def test_describe_executes_modules_once(tmp_path, definitions):
+    log = tmp_path / "executed.log"
+    plugin = make_plugin(tmp_path, log)
+    manifest_path = tmp_path / "manifest.json"
+
+    first = definitions(plugin, manifest_path)
+    assert first.describe_modules()["vp.modules.network"] == {"ping": "(host, count=1)"}
+    assert len(executed(log)) == 1
+
+    first.unload()
+    second = definitions(plugin, manifest_path)
+    assert second.describe_modules()["vp.modules.network"] == {"ping": "(host, count=1)"}
+    assert len(executed(log)) == 1
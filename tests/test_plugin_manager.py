@@ -0,0 +1,243 @@
+import gc
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from definitioncli.definitions.manager import PluginManager
+from definitioncli.definitions.manifest import ManifestCache
+
+JOB = """\
+from ..modules import helper
+
+
+def main():
+    return helper.tag({value!r})
+"""
+
+HELPER = """\
+def tag(value):
+    return value
+"""
+
+
+def write(path: Path, text: str):
+    """
+    Writes `text` and moves the mtime forward, so quick successive edits of the same
+    size are still told apart.
+    """
+    mtime_ns = path.stat().st_mtime_ns if path.exists() else 0
+    path.write_text(text)
+    mtime_ns = max(path.stat().st_mtime_ns, mtime_ns + 1_000_000)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def make_plugin(root: Path, value: str, name: str = "plug") -> Path:
+    plugin = root / name
+    for sub in ("automations", "modules"):
+        (plugin / sub).mkdir(parents=True)
+        (plugin / sub / "__init__.py").write_text("")
+    (plugin / "__init__.py").write_text("")
+    write(plugin / "modules" / "helper.py", HELPER)
+    write(plugin / "automations" / "job.py", JOB.format(value=value))
+    write(plugin / "automations" / "other.py", JOB.format(value=value))
+    return plugin
+
+
+def own_modules(manager: PluginManager):
+    return [name for name in sys.modules if name.startswith(manager._module_prefix)]
+
+
+@pytest.fixture
+def managers():
+    created = []
+
+    def create(*plugin_dirs, **kwargs):
+        manager = PluginManager(*map(str, plugin_dirs), **kwargs)
+        created.append(manager)
+        return manager
+
+    yield create
+    for manager in created:
+        manager.close()
+
+
+def test_snapshot_keeps_its_code_after_reload(tmp_path, managers):
+    plugin = make_plugin(tmp_path, "v1")
+    pm = managers(plugin)
+    snapshot = pm.snapshot
+    resolved = pm.get_callable("plug.automations.other")
+
+    write(plugin / "automations" / "job.py", JOB.format(value="v2"))
+    write(plugin / "automations" / "other.py", JOB.format(value="v2"))
+    assert pm.reload_changed() == {
+        "plug": ["plug.automations.job", "plug.automations.other"]
+    }
+
+    assert pm.get_callable("plug.automations.job")() == "v2"
+    assert pm.get_callable("plug.automations.other")() == "v2"
+    # Resolved before the edit, or not even executed yet: the old snapshot stays on v1
+    assert resolved() == "v1"
+    assert pm.get_callable("plug.automations.other", snapshot=snapshot)() == "v1"
+    assert pm.get_callable("plug.automations.job", snapshot=snapshot)() == "v1"
+
+
+def test_reload_without_changes_keeps_snapshot(tmp_path, managers):
+    pm = managers(make_plugin(tmp_path, "v1"))
+    snapshot = pm.snapshot
+
+    assert pm.reload_changed() == {}
+    assert pm.snapshot is snapshot
+
+
+def test_managers_of_same_named_plugins_are_independent(tmp_path, managers):
+    first = managers(make_plugin(tmp_path / "a", "a"))
+    second = managers(make_plugin(tmp_path / "b", "b"))
+
+    assert first.get_callable("plug.automations.job")() == "a"
+    assert second.get_callable("plug.automations.job")() == "b"
+
+    first.close()
+    assert own_modules(first) == []
+    assert own_modules(second)
+    assert second.get_callable("plug.automations.other")() == "b"
+
+
+def test_reload_carries_unchanged_modules_over(tmp_path, managers):
+    plugin = make_plugin(tmp_path, "v1")
+    pm = managers(plugin)
+    tag = pm.get_callable("plug.modules.helper.tag")
+    other = pm.get_callable("plug.automations.other")
+
+    write(plugin / "automations" / "job.py", JOB.format(value="v2"))
+    assert pm.reload_changed() == {"plug": ["plug.automations.job"]}
+
+    # Unchanged files keep their module objects, nothing of them runs again
+    assert pm.get_callable("plug.modules.helper.tag") is tag
+    assert pm.get_callable("plug.automations.other") is other
+    assert pm.get_callable("plug.automations.job")() == "v2"
+
+
+def test_reload_reports_public_names(tmp_path, managers):
+    plugin = make_plugin(tmp_path, "v1")
+    (plugin / "__init__.py").write_text('__virtualname__ = "vp"\n')
+    net = plugin / "modules" / "net.py"
+    write(net, '__virtualname__ = "network"\n\n\ndef ping():\n    return 1\n')
+    pm = managers(plugin)
+
+    write(net, '__virtualname__ = "network"\n\n\ndef ping():\n    return 2\n')
+    (plugin / "automations" / "other.py").unlink()
+    reloaded = pm.reload_changed()
+
+    assert reloaded == {"vp": ["vp.automations.other", "vp.modules.network"]}
+    assert pm.get_callable("vp.modules.network.ping")() == 2
+
+
+def test_replaced_modules_leave_sys_modules(tmp_path, managers):
+    plugin = make_plugin(tmp_path, "v1")
+    pm = managers(plugin)
+
+    for value in ("v2", "v3"):
+        write(plugin / "automations" / "job.py", JOB.format(value=value))
+        pm.reload_changed()
+    gc.collect()
+
+    # The first load still provides the carried modules, the second has been replaced
+    loads = {name[len(pm._module_prefix):].split("_")[0] for name in own_modules(pm)}
+    assert loads == {"0", "2"}
+
+    pm.close()
+    assert own_modules(pm) == []
+
+
+def test_bare_names_allow_absolute_imports(tmp_path, managers):
+    plugin = make_plugin(tmp_path, "v1")
+    absolute = JOB.replace("from ..modules", "from plug.modules")
+    write(plugin / "automations" / "job.py", absolute.format(value="v1"))
+    pm = managers(plugin, bare_names=True)
+    private = managers(make_plugin(tmp_path / "private", "p"))
+
+    assert pm.get_callable("plug.automations.job")() == "v1"
+    # Extra managers stay private, they don't take over the plain names
+    assert private.get_callable("plug.automations.job")() == "p"
+
+    write(plugin / "automations" / "job.py", absolute.format(value="v2"))
+    pm.reload_changed()
+    assert pm.get_callable("plug.automations.job")() == "v2"
+    assert sys.modules["plug.automations.job"] is pm.plugins["plug"].get_bare_modules()[
+        "plug.automations.job"
+    ]
+
+    pm.close()
+    assert [name for name in sys.modules if name.split(".")[0] == "plug"] == []
+
+
+def test_concurrent_reload_and_get_callable(tmp_path, managers):
+    plugin = make_plugin(tmp_path, "0")
+    pm = managers(plugin)
+    versions = 20
+    stop = threading.Event()
+    failures = []
+
+    def read():
+        while not stop.is_set():
+            try:
+                snapshot = pm.snapshot
+                job = pm.get_callable("plug.automations.job", snapshot=snapshot)
+                other = pm.get_callable("plug.automations.other", snapshot=snapshot)
+                # Both files are written before every reload, a snapshot never mixes them
+                if job is None or other is None or job() != other():
+                    failures.append((job and job(), other and other()))
+            except Exception as e:
+                failures.append(e)
+
+    readers = [threading.Thread(target=read) for _ in range(8)]
+    for reader in readers:
+        reader.start()
+    try:
+        for version in range(1, versions + 1):
+            write(plugin / "automations" / "job.py", JOB.format(value=str(version)))
+            write(plugin / "automations" / "other.py", JOB.format(value=str(version)))
+            assert pm.reload_changed()
+    finally:
+        stop.set()
+        for reader in readers:
+            reader.join()
+
+    assert failures == []
+    assert pm.snapshot.generation == versions
+    assert pm.get_callable("plug.automations.job")() == str(versions)
+
+
+def test_concurrent_get_callable_with_manifest(tmp_path, managers):
+    plugin = make_plugin(tmp_path, "v1")
+    count = 300
+    for n in range(count):
+        (plugin / "modules" / f"m{n}.py").write_text(f"def f{n}():\n    return {n}\n")
+    manifest_path = tmp_path / "manifest.json"
+    pm = managers(plugin, manifest=ManifestCache(manifest_path))
+    start = threading.Barrier(8)
+    failures = []
+
+    def read():
+        start.wait()
+        try:
+            for n in range(count):
+                assert pm.get_callable(f"plug.modules.m{n}.f{n}")() == n
+            assert pm.get_callable("plug.automations.job")() == "v1"
+        except Exception as e:
+            failures.append(e)
+
+    readers = [threading.Thread(target=read) for _ in range(8)]
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        reader.join()
+
+    assert failures == []
+    # The manifest written while the readers raced holds every module
+    saved = ManifestCache(manifest_path)
+    for n in range(count):
+        assert saved.lookup(plugin / "modules" / f"m{n}.py") is not None
@@ -0,0 +1,46 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from definitioncli.definitions.manager import PluginManager
+from definitioncli.definitions.runner import (
+    MODE_THREAD,
+    STATUS_OK,
+    STATUS_TIMEOUT,
+    AutomationRunner,
+)
+
+AUTOMATIONS = {
+    "slow": "import time\n\n\ndef main():\n    time.sleep(3)\n",
+    "quick": "def main():\n    print('hello')\n    return 'done'\n",
+}
+
+
+@pytest.fixture
+def manager(tmp_path: Path):
+    plugin = tmp_path / "rp"
+    for sub in ("automations", "modules"):
+        (plugin / sub).mkdir(parents=True)
+        (plugin / sub / "__init__.py").write_text("")
+    (plugin / "__init__.py").write_text("")
+    for name, source in AUTOMATIONS.items():
+        (plugin / "automations" / f"{name}.py").write_text(source)
+
+    manager = PluginManager(str(plugin))
+    yield manager
+    manager.close()
+
+
+def test_thread_timeout_frees_its_worker(manager):
+    runner = AutomationRunner(manager, workers=1, mode=MODE_THREAD, timeout=0.5)
+
+    start = time.perf_counter()
+    slow, quick = runner.run(["rp.automations.slow", "rp.automations.quick"])
+
+    # The quick one ran without waiting for the abandoned slow one
+    assert time.perf_counter() - start < 2
+    assert slow.status == STATUS_TIMEOUT
+    assert quick.status == STATUS_OK
+    assert quick.value == "done"
+    assert quick.output == "hello\n"
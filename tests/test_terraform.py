@@ -0,0 +1,31 @@
+from definitioncli.models.terraform import (
+    TerraformModule,
+    get_module_name,
+    render_modules,
+    write_modules_by_target,
+)
+
+
+class FirewallRule(TerraformModule):
+    name: str
+    port: int
+
+
+def test_field_only_module_renders():
+    rendered = FirewallRule(name="ssh", port=22).render()
+
+    assert f'module "{get_module_name(FirewallRule)}" {{' in rendered
+    assert 'name = "ssh"' in rendered
+    assert 'port = "22"' in rendered
+
+
+def test_modules_render_in_order_and_by_target(tmp_path):
+    rules = [FirewallRule(name=f"rule{n}", port=n) for n in range(4)]
+
+    assert [f'name = "rule{n}"' in text for n, text in enumerate(render_modules(rules))] == [True] * 4
+
+    counts = write_modules_by_target(
+        rules, lambda rule: f"{rule.port % 2}.tf", directory=tmp_path
+    )
+    assert counts == {tmp_path / "0.tf": 2, tmp_path / "1.tf": 2}
+    assert (tmp_path / "1.tf").read_text().count("module ") == 2